@@ -0,0 +1,155 @@
+"""
+Synthetic crane-like TDMS files for benchmarks.
+
+Every file holds a MachineStatus group with a Timestamp channel (Excel
+serial dates) and a State channel, plus groups of float signals sampled at
+their own rates. Files follow each other in time like recorded data, and
+their time tracks (wf_start_offset/wf_increment) restart at 0 per file, e.g.:
+
+    python benchmarks/generate_tdms.py data/ --files 4 --duration 600 --group Drive:1000:8
+"""
+import os
+import sys
+import argparse
+from datetime import datetime, timedelta
+import numpy as np
+from nptdms import TdmsWriter, RootObject, GroupObject, ChannelObject
+
+# Excel's epoch after accounting for its 1900 leap year bug
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+# Groups besides MachineStatus: (name, sample rate in Hz, channel names)
+DEFAULT_GROUPS = [
+    ("Hoist", 100.0, ["Load", "Speed", "Height", "MotorCurrent"]),
+    ("Drive", 1000.0, ["Torque", "Position", "Speed", "Current"]),
+]
+
+# MachineStatus sample rate in Hz
+DEFAULT_STATUS_RATE = 10.0
+
+
+def parse_group(spec):
+    """
+    Parse a group specification "NAME:RATE:CHANNELS".
+
+    Returns:
+        tuple: (name, rate in Hz, channel names "Signal_00", "Signal_01", ...)
+
+    Raises:
+        argparse.ArgumentTypeError: If the specification is malformed
+    """
+    try:
+        name, rate, count = spec.split(":")
+        rate = float(rate)
+        count = int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected NAME:RATE:CHANNELS, got {spec!r}")
+    if not name or name == "MachineStatus" or rate <= 0 or count <= 0:
+        raise argparse.ArgumentTypeError(f"Invalid group: {spec!r}")
+    return name, rate, [f"Signal_{index:02d}" for index in range(count)]
+
+
+def _signal(rng, t, index):
+    """Return a float signal: a random walk on top of a sine, different per channel"""
+    walk = np.cumsum(rng.normal(0.0, 0.01, len(t)))
+    return walk + np.sin(2 * np.pi * t / (20.0 + 5.0 * index)) * (1.0 + index)
+
+
+def generate_file(path, start_time, duration, groups=DEFAULT_GROUPS, status_rate=DEFAULT_STATUS_RATE,
+                  segment_seconds=60.0, seed=0):
+    """
+    Write one synthetic TDMS file.
+
+    Data is written in segments of segment_seconds, so memory use does not
+    grow with the file duration.
+
+    Args:
+        path (str): Output path
+        start_time (datetime): Wall-clock time of the first sample
+        duration (float): Seconds of data
+        groups (list): (name, rate in Hz, channel names) besides MachineStatus
+        status_rate (float): MachineStatus sample rate in Hz
+        segment_seconds (float): Seconds of data per TDMS segment
+        seed (int): Random seed; the same seed gives the same file
+
+    Returns:
+        int: Samples written over all channels
+    """
+    rng = np.random.default_rng(seed)
+    start_serial = (start_time - EXCEL_EPOCH) / timedelta(days=1)
+    all_groups = [("MachineStatus", status_rate, ["Timestamp", "State"])] + list(groups)
+    samples = 0
+
+    with TdmsWriter(path) as writer:
+        segment_start = 0.0
+        first = True
+        while segment_start < duration:
+            segment_stop = min(segment_start + segment_seconds, duration)
+            objects = [RootObject(properties={"name": os.path.basename(path)})] if first else []
+            for group_name, rate, channel_names in all_groups:
+                begin = int(round(segment_start * rate))
+                end = int(round(segment_stop * rate))
+                t = np.arange(begin, end) / rate
+                if first:
+                    objects.append(GroupObject(group_name))
+                properties = {"wf_start_offset": 0.0, "wf_increment": 1.0 / rate} if first else {}
+                for index, channel_name in enumerate(channel_names):
+                    if group_name == "MachineStatus" and channel_name == "Timestamp":
+                        data = start_serial + t / 86400.0
+                    elif group_name == "MachineStatus" and channel_name == "State":
+                        # Operating state changing every 30 s
+                        data = ((t // 30.0).astype(np.int32) + rng.integers(0, 2)) % 5
+                    else:
+                        data = _signal(rng, t, index)
+                    objects.append(ChannelObject(group_name, channel_name, data, properties=properties))
+                    samples += len(data)
+            writer.write_segment(objects)
+            segment_start = segment_stop
+            first = False
+    return samples
+
+
+def generate_dataset(output_dir, files=3, duration=300.0, groups=DEFAULT_GROUPS, status_rate=DEFAULT_STATUS_RATE,
+                     start_time=datetime(2024, 1, 1, 6, 0, 0), seed=0):
+    """
+    Write consecutive synthetic TDMS files (named by their start time).
+
+    Returns:
+        list: Paths of the written files in chronological order
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for index in range(files):
+        file_start = start_time + timedelta(seconds=index * duration)
+        path = os.path.join(output_dir, f"crane_{file_start:%Y%m%d_%H%M%S}.tdms")
+        generate_file(path, file_start, duration, groups, status_rate, seed=seed + index)
+        paths.append(path)
+    return paths
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Generate synthetic crane-like TDMS files.")
+    parser.add_argument("output_dir", help="Folder for the TDMS files")
+    parser.add_argument("--files", type=int, default=3, help="Number of consecutive files")
+    parser.add_argument("--duration", type=float, default=300.0, help="Seconds of data per file")
+    parser.add_argument("--group", action="append", type=parse_group, metavar="NAME:RATE:CHANNELS",
+                        help="Signal group (repeatable); replaces the default Hoist/Drive groups")
+    parser.add_argument("--status-rate", type=float, default=DEFAULT_STATUS_RATE,
+                        help="MachineStatus sample rate in Hz")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Generate the files; returns the process exit code"""
+    args = parse_args(argv)
+    paths = generate_dataset(args.output_dir, args.files, args.duration, args.group or DEFAULT_GROUPS,
+                             args.status_rate, seed=args.seed)
+    for path in paths:
+        print(f"{path}: {os.path.getsize(path) / 2**20:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+"""
+Benchmarks of the core TDMS operations, without the GUI.
+
+Generates a synthetic dataset (see generate_tdms.py), or uses existing
+files, and times the operations behind loading, previewing, timespan
+filtering, timestamp calculation and exporting. Every benchmark runs in a
+fresh process so peak memory is measured per operation. Results are
+printed as JSON so runs of different versions can be compared, e.g.:
+
+    python benchmarks/run_benchmarks.py --files 4 --duration 600 --output bench_v1.4.json
+    python benchmarks/run_benchmarks.py --data data/ --only load export_csv --repeat 3
+    python benchmarks/run_benchmarks.py --only export_npz export_resampled --max-traced-mb 128
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import multiprocessing
+from datetime import datetime
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+# resource (peak RSS) is not available on Windows
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import numpy as np
+import nptdms
+
+# The benchmarked modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_tdms import generate_dataset, parse_group, DEFAULT_GROUPS, DEFAULT_STATUS_RATE
+from tdms_convert import expand_inputs, load_store, select_channels
+from tdms_data import excel_serial_to_datetime64, find_ranges, select_ranges, timespan_bounds
+from tdms_decimate import MinMaxPyramid, m4_indices_shared
+from tdms_export import export_dataset, export_time_group
+
+# Points the preview benchmarks decimate to (the GUI default)
+PREVIEW_POINTS = 10000
+
+# Channels plotted by the stacked preview benchmark (the GUI default)
+STACKED_CHANNELS = 8
+
+
+def open_dataset(paths, decode=True):
+    """
+    Load the files into a ChannelStore like the GUI does.
+
+    Returns:
+        tuple: (ChannelStore, all channel ids), with every channel decoded
+        if decode is set
+    """
+    store, _ = load_store(paths)
+    channel_ids = select_channels(store)
+    if decode:
+        for channel_id in channel_ids:
+            store.get(channel_id)
+    return store, channel_ids
+
+
+def fastest_channels(store, channel_ids):
+    """Return the time axis and channels of the group with the most samples"""
+    group = export_time_group(store, channel_ids)
+    channels = [store.get(channel_id) for channel_id in channel_ids
+                if store.channels[channel_id]['group_name'] == group]
+    return store.time_axes[group][1], channels
+
+
+# Benchmarks: called with (paths, workdir), they do their setup and return
+# the timed operation, which returns (rows processed, bytes processed)
+
+def bench_load(paths, workdir):
+    """Read metadata, merge the files and decode every channel"""
+    def run():
+        store, channel_ids = open_dataset(paths)
+        rows = sum(len(store.get(channel_id)) for channel_id in channel_ids)
+        return rows, sum(store.get(channel_id).nbytes for channel_id in channel_ids)
+    return run
+
+
+def bench_timestamps(paths, workdir):
+    """
+    Convert the MachineStatus Excel serial dates to datetime64 per file, as
+    ChannelStore.timestamps() does before caching the result.
+    """
+    store, _ = open_dataset(paths, decode=False)
+    serial_dates = store.get(store.find_channel("MachineStatus", "Timestamp"))
+
+    def run():
+        timestamps = [excel_serial_to_datetime64(chunk) for chunk in serial_dates.chunks]
+        return len(serial_dates), sum(chunk.nbytes for chunk in timestamps)
+    return run
+
+
+def bench_timespan(paths, workdir):
+    """Find the middle half of every file on the fastest time axis and slice its channels"""
+    store, channel_ids = open_dataset(paths)
+    axis, channels = fastest_channels(store, channel_ids)
+    first_file = axis.chunks[0]
+    span = float(first_file[-1] - first_file[0])
+
+    def run():
+        lower, upper = timespan_bounds(axis, span * 0.25, span * 0.75)
+        ranges = find_ranges(axis, lower, upper)
+        selected = [select_ranges(channel, ranges) for channel in channels]
+        return len(axis), sum(channel.nbytes for channel in selected)
+    return run
+
+
+def bench_preview(paths, workdir):
+    """Build the min/max pyramid of the fastest channel and decimate it"""
+    store, channel_ids = open_dataset(paths)
+    axis, channels = fastest_channels(store, channel_ids)
+    y = channels[0]
+
+    def run():
+        pyramid = MinMaxPyramid(y)
+        indices = pyramid.indices(0, len(y), PREVIEW_POINTS // 4)
+        axis[indices]
+        return len(y), y.nbytes
+    return run
+
+
+def bench_preview_stacked(paths, workdir):
+    """Decimate the channels of the fastest group with one shared bucket layout"""
+    store, channel_ids = open_dataset(paths)
+    axis, channels = fastest_channels(store, channel_ids)
+    ys = channels[:STACKED_CHANNELS]
+
+    def run():
+        indices = m4_indices_shared(ys, PREVIEW_POINTS // 4)
+        axis[indices.ravel()]
+        return len(axis) * len(ys), sum(y.nbytes for y in ys)
+    return run
+
+
+def bench_export(paths, workdir, export_format='csv', **options):
+    """Export all channels with the calculated timestamp; rows are input rows (also when resampling)"""
+    store, channel_ids = open_dataset(paths)
+    axis, _ = fastest_channels(store, channel_ids)
+    output_file = os.path.join(workdir, f"export.{export_format}")
+
+    def run():
+        export_dataset(store, channel_ids, output_file, export_format, include_timestamp=True, **options)
+        return len(axis), os.path.getsize(output_file)
+    return run
+
+
+BENCHMARKS = {
+    'load': bench_load,
+    'timestamps': bench_timestamps,
+    'timespan': bench_timespan,
+    'preview': bench_preview,
+    'preview_stacked': bench_preview_stacked,
+    'export_csv': partial(bench_export, export_format='csv'),
+    'export_npz': partial(bench_export, export_format='npz'),
+    'export_resampled': partial(bench_export, export_format='csv', resample_interval=1.0,
+                                aggregations=("mean", "min", "max")),
+}
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MB, or None without resource"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return round(peak / 2**20 if sys.platform == "darwin" else peak / 2**10, 1)
+
+
+def run_benchmark(name, paths, workdir, repeat=1, trace=False):
+    """
+    Run one benchmark and measure it.
+
+    With trace, the operation runs once more under tracemalloc (not timed)
+    to measure the memory it allocates itself; unlike the peak RSS this
+    excludes the setup, e.g. the decoded channels an export reads from.
+
+    Returns:
+        dict: 'name', 'wall_s' (fastest run), 'runs_s', 'rows', 'rows_per_s',
+        'mb', 'mb_per_s', 'peak_rss_mb' (of the process, setup included) and
+        'traced_peak_mb' (None without trace)
+    """
+    run = BENCHMARKS[name](paths, workdir)
+    times = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        rows, processed_bytes = run()
+        times.append(time.perf_counter() - start)
+
+    traced_peak = None
+    if trace:
+        tracemalloc.start()
+        try:
+            run()
+            traced_peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    wall = min(times)
+    mb = processed_bytes / 2**20
+    return {
+        'name': name,
+        'wall_s': round(wall, 4),
+        'runs_s': [round(seconds, 4) for seconds in times],
+        'rows': int(rows),
+        'rows_per_s': round(rows / wall) if wall > 0 else None,
+        'mb': round(mb, 2),
+        'mb_per_s': round(mb / wall, 1) if wall > 0 else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'traced_peak_mb': None if traced_peak is None else round(traced_peak / 2**20, 1)
+    }
+
+
+def run_isolated(name, paths, workdir, repeat=1, trace=False):
+    """Run a benchmark in a fresh process, so its peak RSS is its own"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(run_benchmark, name, paths, workdir, repeat, trace).result()
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Benchmark loading, preview, timespan, timestamp and export.")
+    parser.add_argument("--data", nargs="+", help="Existing TDMS files, folders or globs instead of synthetic files")
+    parser.add_argument("--files", type=int, default=3, help="Synthetic files to generate")
+    parser.add_argument("--duration", type=float, default=300.0, help="Seconds of data per synthetic file")
+    parser.add_argument("--group", action="append", type=parse_group, metavar="NAME:RATE:CHANNELS",
+                        help="Synthetic signal group (repeatable); replaces the default Hoist/Drive groups")
+    parser.add_argument("--status-rate", type=float, default=DEFAULT_STATUS_RATE,
+                        help="Synthetic MachineStatus sample rate in Hz")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the synthetic data")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmarks to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per benchmark; the fastest is reported")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Also measure the memory each operation allocates (tracemalloc, one extra run)")
+    parser.add_argument("--max-traced-mb", type=float, metavar="MB",
+                        help="Fail if an operation allocates more than this (implies --trace-memory)")
+    parser.add_argument("--in-process", action="store_true",
+                        help="Run all benchmarks in this process (peak RSS is then cumulative)")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated files and exports")
+    parser.add_argument("-o", "--output", help="Write the JSON report to this file as well")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmarks; returns the process exit code"""
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="tdms_bench_")
+    try:
+        groups = args.group or DEFAULT_GROUPS
+        if args.data:
+            paths = expand_inputs(args.data)
+            dataset = {'source': args.data}
+        else:
+            print(f"Generating {args.files} files of {args.duration:g} s in {workdir}...", file=sys.stderr)
+            paths = generate_dataset(os.path.join(workdir, "data"), args.files, args.duration, groups,
+                                     args.status_rate, seed=args.seed)
+            dataset = {
+                'files': args.files,
+                'duration_s': args.duration,
+                'status_rate_hz': args.status_rate,
+                'groups': [{'name': name, 'rate_hz': rate, 'channels': len(channels)}
+                           for name, rate, channels in groups],
+                'seed': args.seed
+            }
+        dataset['paths'] = len(paths)
+        dataset['mb'] = round(sum(os.path.getsize(path) for path in paths) / 2**20, 2)
+
+        trace = args.trace_memory or args.max_traced_mb is not None
+        results = []
+        for name in args.only or list(BENCHMARKS):
+            print(f"Running {name}...", file=sys.stderr)
+            if args.in_process:
+                result = run_benchmark(name, paths, workdir, args.repeat, trace)
+            else:
+                result = run_isolated(name, paths, workdir, args.repeat, trace)
+            traced = f", {result['traced_peak_mb']} MB allocated" if trace else ""
+            print(f"  {result['wall_s']:.3f} s, {result['rows_per_s']} rows/s, {result['mb_per_s']} MB/s{traced}",
+                  file=sys.stderr)
+            results.append(result)
+
+        report = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'nptdms': nptdms.__version__,
+            'cpu_count': os.cpu_count(),
+            'dataset': dataset,
+            'results': results
+        }
+        text = json.dumps(report, indent=2)
+        print(text)
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(text + "\n")
+
+        if args.max_traced_mb is not None:
+            over = [result for result in results if result['traced_peak_mb'] > args.max_traced_mb]
+            for result in over:
+                print(f"Error: {result['name']} allocated {result['traced_peak_mb']} MB "
+                      f"(limit {args.max_traced_mb:g} MB)", file=sys.stderr)
+            if over:
+                return 1
+        return 0
+    finally:
+        if args.keep:
+            print(f"Kept benchmark files in {workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
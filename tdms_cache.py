@@ -0,0 +1,155 @@
+"""Persistent on-disk cache of decoded TDMS channel data."""
+import os
+import hashlib
+import tempfile
+import numpy as np
+
+# Default size budget of the cache directory
+DEFAULT_CACHE_BYTES = 4 * 1024 ** 3
+
+
+class DecodedChannelCache:
+    """
+    Cache of decoded channels and time tracks stored as .npy files.
+
+    Entries are keyed by the TDMS file path, size and modification time and
+    by the channel path, so a changed file is never served stale data. Cached
+    arrays are loaded back memory-mapped (read-only). The directory is kept
+    under a size budget by evicting the least recently used entries; the
+    modification time of an entry is refreshed on every hit.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def entry_path(self, file_path, channel_path):
+        """
+        Return the cache file path for a channel of a TDMS file.
+
+        Raises:
+            OSError: If the TDMS file cannot be accessed
+        """
+        stat = os.stat(file_path)
+        key = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}|{channel_path}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.npy")
+
+    def load(self, file_path, channel_path):
+        """Return the cached array memory-mapped, or None if it is not cached"""
+        try:
+            entry = self.entry_path(file_path, channel_path)
+            data = np.load(entry, mmap_mode='r')
+            # Mark as recently used for LRU eviction
+            os.utime(entry)
+            return data
+        except (OSError, ValueError):
+            return None
+
+    def store(self, file_path, channel_path, data):
+        """
+        Write an array to the cache and enforce the size budget.
+
+        Empty and object arrays cannot be memory-mapped and are not cached.
+
+        Returns:
+            bool: True if the array was stored
+        """
+        data = np.asarray(data)
+        if data.size == 0 or data.dtype.hasobject or data.nbytes > self.max_bytes:
+            return False
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entry = self.entry_path(file_path, channel_path)
+            # Write to a temporary file first so readers never see partial data
+            fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    np.save(f, data, allow_pickle=False)
+                os.replace(temp_path, entry)
+            except Exception:
+                os.remove(temp_path)
+                raise
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not write cache entry: {e}")
+            return False
+
+        self.evict()
+        return True
+
+    def get_or_decode(self, file_path, channel_path, decode):
+        """
+        Return a cached array, or decode, cache and return it.
+
+        Args:
+            file_path (str): Path of the TDMS file
+            channel_path (str): Channel path inside the file
+            decode (callable): Returns the decoded array on a cache miss
+
+        Returns:
+            numpy.ndarray: Memory-mapped cached data, or the decoded array
+        """
+        data = self.load(file_path, channel_path)
+        if data is not None:
+            return data
+
+        data = decode()
+        if self.store(file_path, channel_path, data):
+            cached = self.load(file_path, channel_path)
+            if cached is not None:
+                return cached
+        return data
+
+    def entries(self):
+        """Return (path, size, last use) of all cache entries"""
+        entries = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return entries
+
+        for name in names:
+            if not name.endswith(".npy"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def size(self):
+        """Total size of the cache entries in bytes"""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits its budget"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                # Entry may be memory-mapped (Windows) or already removed
+                continue
+
+    def clear(self):
+        """
+        Delete all cache entries.
+
+        Returns:
+            int: Number of bytes freed
+        """
+        freed = 0
+        for path, size, _ in self.entries():
+            try:
+                os.remove(path)
+                freed += size
+            except OSError:
+                continue
+        return freed
@@ -0,0 +1,286 @@
+"""
+Headless TDMS converter.
+
+Exports TDMS channels to CSV, Parquet, Feather, HDF5 or NPZ without the
+GUI (no tkinter or matplotlib imports), e.g.:
+
+    python tdms_convert.py data/*.tdms -o export/run.csv --pattern "MachineStatus - *"
+    python tdms_convert.py data/ --per-file -o export/ --format parquet --jobs 4
+    python tdms_convert.py data/*.tdms -o export/run_1s.csv --resample 1 --agg mean max
+"""
+import os
+import sys
+import glob
+import fnmatch
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tdms_data import ChannelStore, open_tdms_file, scan_tdms_file, tdms_handle, close_tdms_handle, parse_timespan
+from tdms_index import read_file_metadata
+from tdms_export import (export_dataset, default_export_name, EXPORT_FORMATS, PARQUET_COMPRESSIONS,
+                         RESAMPLE_AGGREGATIONS, format_from_path)
+
+
+def expand_inputs(inputs):
+    """
+    Expand input arguments to TDMS file paths.
+
+    Args:
+        inputs (list): Files, folders (all *.tdms inside) or glob patterns
+
+    Returns:
+        list: Unique file paths in argument order
+    """
+    paths = []
+    seen = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = sorted(glob.glob(os.path.join(item, "*.tdms")))
+        elif glob.has_magic(item):
+            matches = sorted(glob.glob(item))
+        else:
+            matches = [item]
+        for path in matches:
+            # The same file given twice (e.g. "run.tdms" and "./run.tdms") is read once
+            if os.path.abspath(path) not in seen:
+                seen.add(os.path.abspath(path))
+                paths.append(path)
+    return paths
+
+
+def load_store(paths, lazy=True):
+    """
+    Open TDMS files and combine them into a ChannelStore.
+
+    Files are ordered by their first MachineStatus timestamp like in the GUI.
+
+    Returns:
+        tuple: (ChannelStore, list of file entries)
+    """
+    files = []
+    segments = []
+    try:
+        for path in paths:
+            file_info = open_tdms_file(path, lazy)
+            files.append(file_info)
+            with tdms_handle(file_info) as tdms_file:
+                record = read_file_metadata(path, tdms_file)
+                file_info['first_timestamp'] = record['first_timestamp']
+                file_info['last_timestamp'] = record['last_timestamp']
+                segments.append(scan_tdms_file(file_info))
+
+        store = ChannelStore()
+        store.add_segments(segments)
+    except BaseException:
+        # Files opened before the failing one are not returned to the caller
+        close_files(files)
+        raise
+    return store, files
+
+
+def close_files(files):
+    """Close the handles of lazily opened file entries"""
+    for file_info in files:
+        if file_info['lazy']:
+            close_tdms_handle(file_info)
+
+
+def per_file_outputs(paths, output_dir, extension):
+    """
+    Return the output path of every input file exported on its own.
+
+    Inputs sharing a file name (e.g. a/run.tdms and b/run.tdms) are written
+    below output_dir in subfolders mirroring their folders relative to
+    their common parent, so no two exports write the same file.
+
+    Returns:
+        list: Output paths in input order
+    """
+    names = [default_export_name([os.path.basename(path)], extension) for path in paths]
+    counts = Counter(os.path.normcase(name) for name in names)
+    folders = [os.path.dirname(os.path.abspath(path)) for path in paths]
+    shared = [folder for folder, name in zip(folders, names) if counts[os.path.normcase(name)] > 1]
+    common = os.path.commonpath(shared) if shared else None
+
+    outputs = []
+    for folder, name in zip(folders, names):
+        if counts[os.path.normcase(name)] > 1:
+            outputs.append(os.path.normpath(os.path.join(output_dir, os.path.relpath(folder, common), name)))
+        else:
+            outputs.append(os.path.join(output_dir, name))
+    return outputs
+
+
+def select_channels(store, names=None, pattern=None):
+    """
+    Pick the channels to export.
+
+    Args:
+        store (ChannelStore): Loaded dataset
+        names (list): Display names ("Group - Channel") or ids ("Group/Channel")
+        pattern (str): Case-insensitive glob matched against display names
+
+    Returns:
+        list: Channel ids; named channels first in the given order, then
+        pattern matches by display name. All channels if neither is given.
+
+    Raises:
+        ValueError: If a named channel does not exist
+    """
+    sorted_ids = [store.display_names[name] for name in sorted(store.display_names)]
+    if not names and not pattern:
+        return sorted_ids
+
+    selected = []
+    for name in names or []:
+        channel_id = name if name in store.channels else store.channel_id(name)
+        if channel_id is None:
+            raise ValueError(f"Channel not found: {name}")
+        if channel_id not in selected:
+            selected.append(channel_id)
+
+    if pattern:
+        pattern = pattern.lower()
+        for channel_id in sorted_ids:
+            display_name = store.channels[channel_id]['display_name'].lower()
+            if channel_id not in selected and fnmatch.fnmatchcase(display_name, pattern):
+                selected.append(channel_id)
+    return selected
+
+
+def convert(paths, output_file, channels=None, pattern=None, start=None, end=None, export_format=None,
+            include_time=True, include_timestamp=False, include_group_names=True,
+            compression="snappy", workers=1, lazy=True, resample=None, aggregations=("mean",)):
+    """
+    Export one set of TDMS files (combined as one dataset) to one file.
+
+    Args:
+        paths (list): TDMS files of the set
+        output_file (str): Output path; the format follows the extension
+            unless export_format is given
+        channels (list): Channel names to export (see select_channels)
+        pattern (str): Glob of channel display names to export
+        start (str): Timespan start (same formats as the GUI), or None
+        end (str): Timespan end, or None
+        export_format (str): Key of EXPORT_FORMATS
+        include_time (bool): Export the time/index column
+        include_timestamp (bool): Export the calculated timestamp column
+        include_group_names (bool): Prefix columns with the group name
+        compression (str): Parquet compression
+        workers (int): CSV formatting processes
+        lazy (bool): Read channel data on demand
+        resample (float): Resampling interval in seconds, or None for all samples
+        aggregations (tuple): Per-bucket aggregations when resampling
+
+    Returns:
+        dict: Summary from tdms_export.export_dataset
+    """
+    store, files = load_store(paths, lazy)
+    try:
+        channel_ids = select_channels(store, channels, pattern)
+        if not channel_ids:
+            raise ValueError("No channels selected")
+
+        start_value = parse_timespan(start) if start else None
+        end_value = parse_timespan(end) if end else None
+        if (start and start_value is None) or (end and end_value is None):
+            raise ValueError(f"Invalid timespan: {start} to {end}")
+
+        output_dir = os.path.dirname(output_file)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        return export_dataset(store, channel_ids, output_file, export_format, include_time, include_timestamp,
+                              include_group_names, start_value, end_value, workers=workers,
+                              compression=compression, strict_timespan=True, resample_interval=resample,
+                              aggregations=aggregations)
+    finally:
+        close_files(files)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Convert TDMS channels to CSV, Parquet, Feather, HDF5 or NPZ.")
+    parser.add_argument("inputs", nargs="+", help="TDMS files, folders or glob patterns")
+    parser.add_argument("-o", "--output",
+                        help="Output file (output folder with --per-file); default: export/<generated name>")
+    parser.add_argument("-f", "--format", choices=list(EXPORT_FORMATS),
+                        help="Output format (default: from the output extension, else csv)")
+    parser.add_argument("-c", "--channels", nargs="+", metavar="NAME",
+                        help="Channels to export as 'Group - Channel' or 'Group/Channel'")
+    parser.add_argument("-p", "--pattern", help="Glob of channel names to export, e.g. 'MachineStatus - *'")
+    parser.add_argument("--start", help="Timespan start (seconds, HH:MM:SS or YYYY-MM-DD HH:MM:SS)")
+    parser.add_argument("--end", help="Timespan end")
+    parser.add_argument("--no-time", action="store_true", help="Do not export the time/index column")
+    parser.add_argument("--timestamp", action="store_true",
+                        help="Export the calculated timestamp column (from MachineStatus - Timestamp)")
+    parser.add_argument("--no-group-names", action="store_true", help="Use only channel names as column headers")
+    parser.add_argument("--resample", type=float, metavar="SECONDS",
+                        help="Export one row per interval instead of every sample")
+    parser.add_argument("--agg", nargs="+", choices=RESAMPLE_AGGREGATIONS, default=["mean"],
+                        help="Aggregations per resampling interval (default: mean)")
+    parser.add_argument("--compression", choices=PARQUET_COMPRESSIONS, default=PARQUET_COMPRESSIONS[0],
+                        help="Parquet compression")
+    parser.add_argument("--per-file", action="store_true",
+                        help="Export every input file separately instead of one combined dataset")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="File sets converted in parallel (with --per-file)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="CSV formatting processes per export")
+    parser.add_argument("--eager", action="store_true", help="Read whole files up front instead of on demand")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the converter; returns the process exit code"""
+    args = parse_args(argv)
+    paths = expand_inputs(args.inputs)
+    missing = [path for path in paths if not os.path.isfile(path)]
+    if not paths or missing:
+        print(f"Error: No TDMS files found: {', '.join(missing or args.inputs)}", file=sys.stderr)
+        return 2
+
+    export_format = args.format or (format_from_path(args.output) if args.output and not args.per_file else 'csv')
+    extension = EXPORT_FORMATS[export_format][1]
+
+    # Independent file sets: one per file, or all files combined
+    if args.per_file:
+        output_dir = args.output or "export"
+        jobs = [([path], output_file)
+                for path, output_file in zip(paths, per_file_outputs(paths, output_dir, extension))]
+    else:
+        output_file = args.output or os.path.join(
+            "export", default_export_name([os.path.basename(path) for path in paths], extension))
+        jobs = [(paths, output_file)]
+
+    options = dict(channels=args.channels, pattern=args.pattern, start=args.start, end=args.end,
+                   export_format=export_format, include_time=not args.no_time,
+                   include_timestamp=args.timestamp, include_group_names=not args.no_group_names,
+                   compression=args.compression, workers=max(1, args.workers), lazy=not args.eager,
+                   resample=args.resample, aggregations=tuple(args.agg))
+
+    failures = 0
+    if args.jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            futures = {executor.submit(convert, job_paths, job_output, **options): job_output
+                       for job_paths, job_output in jobs}
+            for future in as_completed(futures):
+                failures += _report(futures[future], future)
+    else:
+        for job_paths, job_output in jobs:
+            failures += _report(job_output, lambda: convert(job_paths, job_output, **options))
+
+    return 1 if failures else 0
+
+
+def _report(output_file, result):
+    """Print the outcome of one conversion (a future or a callable); returns 1 on failure"""
+    try:
+        summary = result.result() if hasattr(result, 'result') else result()
+    except Exception as e:
+        print(f"Error: {output_file}: {e}", file=sys.stderr)
+        return 1
+    print(f"{summary['output']}: {summary['rows']} rows, {summary['columns']} columns")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
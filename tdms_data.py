@@ -0,0 +1,1336 @@
+"""Channel data handling for TDMS files, independent of the GUI."""
+import os
+import re
+import bisect
+import fnmatch
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import numpy as np
+from nptdms import TdmsFile
+from nptdms.common import ObjectPath
+
+# Excel's epoch after accounting for its 1900 leap year bug
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+# Lazily opened TDMS files that keep their OS handle open at the same time;
+# the least recently used handles beyond this are closed and reopened on
+# their next use (see tdms_handle)
+MAX_OPEN_FILES = 64
+
+
+def excel_serial_to_datetime(excel_time):
+    """Convert one Excel serial date (days since EXCEL_EPOCH) to a datetime"""
+    return EXCEL_EPOCH + timedelta(days=float(excel_time))
+
+
+def excel_serial_to_datetime64(excel_times):
+    """
+    Convert Excel serial dates to datetime64[ns] with vectorized arithmetic.
+
+    Times are rounded to whole microseconds like datetime.timedelta. Zero,
+    NaN and out-of-range values become NaT.
+
+    Args:
+        excel_times (array-like): Days since EXCEL_EPOCH
+
+    Returns:
+        numpy.ndarray: datetime64[ns] array
+    """
+    days = np.asarray(excel_times, dtype=np.float64)
+    epoch = np.datetime64(EXCEL_EPOCH, 'us')
+    # Keep the result inside the datetime64[ns] range
+    limit = (np.datetime64('2262-01-01', 'us') - epoch) / np.timedelta64(1, 'D')
+    valid = np.isfinite(days) & (days != 0) & (np.abs(days) < limit)
+    days = days[valid]
+
+    # Whole days and the day fraction are scaled separately so the
+    # microsecond rounding matches timedelta(days=...) exactly
+    whole_days = np.floor(days)
+    microseconds = (whole_days.astype(np.int64) * 86400000000 +
+                    np.round((days - whole_days) * 86400e6).astype(np.int64))
+
+    result = np.full(len(valid), np.datetime64('NaT'), dtype='datetime64[ns]')
+    result[valid] = epoch + microseconds.astype('timedelta64[us]')
+    return result
+
+
+def format_timestamps(timestamps):
+    """
+    Format datetime64 values as "YYYY-MM-DD HH:MM:SS.mmm" strings.
+
+    The formatting is vectorized: the text of every date, second of the day
+    and millisecond occurring in the data is rendered once into lookup
+    tables, and the rows are assembled by gathering from those tables
+    straight into the character buffer of the result. NaT becomes an empty
+    string.
+
+    Args:
+        timestamps (array-like): datetime64 values (years 1000 to 9999)
+
+    Returns:
+        numpy.ndarray: Fixed-width unicode string array
+    """
+    timestamps = np.asarray(timestamps).astype('datetime64[ms]')
+    missing = np.isnat(timestamps)
+    text = np.zeros(len(timestamps), dtype='<U23')
+    if missing.all():
+        return text
+
+    milliseconds = np.where(missing, timestamps[~missing][0], timestamps).view(np.int64)
+    day_numbers, milliseconds = np.divmod(milliseconds, 86400000)
+    seconds, milliseconds = np.divmod(milliseconds, 1000)
+    characters = text.view(np.uint32).reshape(len(text), 23)
+
+    # "YYYY-MM-DD" of each date in the covered range (or of each distinct
+    # date if the range is sparse)
+    first_day = int(day_numbers.min())
+    day_count = int(day_numbers.max()) - first_day + 1
+    if day_count <= len(day_numbers):
+        dates = np.arange(first_day, first_day + day_count)
+        day_index = day_numbers - first_day
+    else:
+        dates, day_index = np.unique(day_numbers, return_inverse=True)
+    date_text = np.datetime_as_string(dates.astype('datetime64[D]')).astype('<U10')
+    characters[:, :10] = date_text.view(np.uint32).reshape(len(dates), 10)[day_index]
+
+    seconds_table, milliseconds_table = _time_text_tables()
+    characters[:, 10:19] = seconds_table[seconds]
+    characters[:, 19:] = milliseconds_table[milliseconds]
+
+    text[missing] = ""
+    return text
+
+
+def _time_text_tables():
+    """
+    Return the characters of " HH:MM:SS" for every second of a day and of
+    ".mmm" for every millisecond, built on first use.
+    """
+    if not _TIME_TEXT_TABLES:
+        seconds = np.datetime_as_string(np.arange(86400).astype('datetime64[s]')).astype('<U19')
+        seconds_table = seconds.view(np.uint32).reshape(86400, 19)[:, 10:].copy()
+        seconds_table[:, 0] = ord(' ')
+        milliseconds = np.char.add(".", np.char.zfill(np.arange(1000).astype('<U3'), 3)).astype('<U4')
+        _TIME_TEXT_TABLES.extend([seconds_table, milliseconds.view(np.uint32).reshape(1000, 4)])
+    return _TIME_TEXT_TABLES
+
+
+_TIME_TEXT_TABLES = []
+
+
+def open_tdms_file(file_path, lazy=True, defer_open=False):
+    """
+    Open a TDMS file and describe it as a file entry.
+
+    Args:
+        file_path (str): Path of the TDMS file
+        lazy (bool): Only read metadata and read channels on demand
+            (TdmsFile.open) instead of decoding all data up front
+            (TdmsFile.read). Lazy files share a bounded set of open
+            handles; use tdms_handle() to access them
+        defer_open (bool): Do not open a lazy file yet; it is opened by
+            tdms_handle() when its data is first needed
+
+    Returns:
+        dict: File entry with 'path', 'name', 'tdms_obj' and 'lazy' keys
+    """
+    file_info = {
+        'path': file_path,
+        'name': os.path.basename(file_path),
+        'tdms_obj': None if lazy else TdmsFile.read(file_path),
+        'lazy': lazy
+    }
+    if lazy and not defer_open:
+        with tdms_handle(file_info):
+            pass
+    return file_info
+
+
+# Lazy file entries with an open handle, least recently used first
+_open_files = OrderedDict()
+_open_files_lock = threading.Lock()
+
+
+@contextmanager
+def tdms_handle(file_info):
+    """
+    Use the TdmsFile of a file entry, (re)opening a lazy file if needed.
+
+    At most MAX_OPEN_FILES lazy files keep their OS handle; opening more
+    closes the least recently used handles that are not in use, and they
+    are reopened here on their next use (TdmsFile.open reads only the
+    metadata). A handle is never closed while it is in use.
+
+    Yields:
+        TdmsFile: The open file
+    """
+    if not file_info['lazy']:
+        # Read into memory by TdmsFile.read; holds no handle
+        yield file_info['tdms_obj']
+        return
+
+    with _open_files_lock:
+        file_lock = file_info.setdefault('handle_lock', threading.Lock())
+        file_info['handle_users'] = file_info.get('handle_users', 0) + 1
+    try:
+        # Opened outside the pool lock, so files are opened in parallel
+        with file_lock:
+            if file_info['tdms_obj'] is None:
+                file_info['tdms_obj'] = TdmsFile.open(file_info['path'])
+        with _open_files_lock:
+            _open_files[id(file_info)] = file_info
+            _open_files.move_to_end(id(file_info))
+            _close_idle_files()
+        yield file_info['tdms_obj']
+    finally:
+        with _open_files_lock:
+            file_info['handle_users'] -= 1
+            _close_idle_files()
+
+
+def _close_idle_files():
+    """Close least recently used handles that are not in use beyond MAX_OPEN_FILES (pool lock held)"""
+    excess = len(_open_files) - MAX_OPEN_FILES
+    for key, file_info in list(_open_files.items()):
+        if excess <= 0:
+            break
+        if file_info.get('handle_users', 0) > 0:
+            continue
+        del _open_files[key]
+        _close_handle(file_info)
+        excess -= 1
+
+
+def _close_handle(file_info):
+    """Close the TdmsFile of a file entry and forget it"""
+    tdms_file = file_info['tdms_obj']
+    file_info['tdms_obj'] = None
+    if tdms_file is not None:
+        try:
+            tdms_file.close()
+        except Exception as e:
+            print(f"Warning: Could not close {file_info['name']}: {e}")
+
+
+def close_tdms_handle(file_info):
+    """
+    Close the file handle of a file entry that is no longer used.
+
+    A lazy entry would be reopened by its next tdms_handle(); entries read
+    into memory drop their data.
+    """
+    with _open_files_lock:
+        _open_files.pop(id(file_info), None)
+        _close_handle(file_info)
+
+
+def file_order_key(file_info):
+    """Sort key placing files by first MachineStatus timestamp (if known), then by name"""
+    first_timestamp = file_info.get('first_timestamp')
+    return (first_timestamp is None, first_timestamp or 0.0, file_info['name'])
+
+
+class ChunkedArray:
+    """
+    Read-only view presenting several 1-D arrays as one logical array.
+
+    The chunks are not copied: slices return another ChunkedArray over the
+    covered chunk parts, while boolean masks and index arrays gather only
+    the requested samples from the chunks involved. A contiguous copy is
+    made only when a caller asks for one with to_numpy() or np.asarray().
+    """
+
+    def __init__(self, chunks, dtype=None):
+        self.chunks = [np.asarray(chunk) for chunk in chunks if len(chunk) > 0]
+        self.offsets = np.zeros(len(self.chunks) + 1, dtype=np.int64)
+        np.cumsum([len(chunk) for chunk in self.chunks], out=self.offsets[1:])
+        if dtype is not None:
+            self.dtype = np.dtype(dtype)
+        elif self.chunks:
+            self.dtype = np.result_type(*self.chunks)
+        else:
+            self.dtype = np.dtype(np.float64)
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __repr__(self):
+        return f"ChunkedArray(length={len(self)}, chunks={len(self.chunks)}, dtype={self.dtype})"
+
+    @property
+    def shape(self):
+        return (len(self),)
+
+    @property
+    def ndim(self):
+        return 1
+
+    @property
+    def nbytes(self):
+        return sum(chunk.nbytes for chunk in self.chunks)
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.to_numpy()
+        if dtype is not None:
+            array = array.astype(dtype, copy=False)
+        return array
+
+    def to_numpy(self):
+        """Return the data as one contiguous array (no copy for a single chunk)"""
+        if not self.chunks:
+            return np.empty(0, dtype=self.dtype)
+        if len(self.chunks) == 1:
+            return self.chunks[0]
+        return np.concatenate(self.chunks).astype(self.dtype, copy=False)
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            yield from chunk
+
+    def chunk_ranges(self):
+        """Yield (start, stop, chunk) with the logical index range of each chunk"""
+        for index, chunk in enumerate(self.chunks):
+            yield int(self.offsets[index]), int(self.offsets[index + 1]), chunk
+
+    def slice_range(self, start, stop):
+        """
+        Return the samples in [start, stop) as a view touching only the
+        chunks that cover that range.
+        """
+        start = max(0, min(start, len(self)))
+        stop = max(start, min(stop, len(self)))
+        first = int(np.searchsorted(self.offsets, start, side='right')) - 1
+        parts = []
+        for index in range(max(first, 0), len(self.chunks)):
+            chunk_start = self.offsets[index]
+            if chunk_start >= stop:
+                break
+            parts.append(self.chunks[index][max(start - chunk_start, 0):stop - chunk_start])
+        return ChunkedArray(parts, dtype=self.dtype)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            index = int(key)
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError(f"index {key} is out of bounds for length {len(self)}")
+            chunk_index = int(np.searchsorted(self.offsets, index, side='right')) - 1
+            return self.chunks[chunk_index][index - self.offsets[chunk_index]]
+
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                return self.slice_range(start, stop)
+            return self.take(np.arange(start, stop, step))
+
+        key = np.asarray(key)
+        if key.dtype == bool:
+            if len(key) != len(self):
+                raise IndexError(f"boolean mask of length {len(key)} does not match length {len(self)}")
+            parts = [chunk[key[start:stop]] for start, stop, chunk in self.chunk_ranges()]
+            return _concatenate(parts, self.dtype)
+
+        return self.take(key)
+
+    def take(self, indices):
+        """Gather the samples at the given (possibly negative) indices"""
+        indices = np.asarray(indices, dtype=np.int64)
+        indices = np.where(indices < 0, indices + len(self), indices)
+        if indices.size and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError(f"index out of bounds for length {len(self)}")
+
+        result = np.empty(indices.shape, dtype=self.dtype)
+        chunk_of = np.searchsorted(self.offsets, indices, side='right') - 1
+        for chunk_index in np.unique(chunk_of):
+            selected = chunk_of == chunk_index
+            result[selected] = self.chunks[chunk_index][indices[selected] - self.offsets[chunk_index]]
+        return result
+
+    def searchsorted(self, value, side='left'):
+        """
+        Find the insertion position of a value, like numpy.searchsorted.
+
+        The data must be sorted in ascending order across all chunks. Only
+        the last sample of each chunk and one chunk are searched.
+        """
+        if not self.chunks:
+            return 0
+        lasts = np.array([chunk[-1] for chunk in self.chunks])
+        chunk_index = int(np.searchsorted(lasts, value, side=side))
+        if chunk_index == len(self.chunks):
+            return len(self)
+        position = np.searchsorted(self.chunks[chunk_index], value, side=side)
+        return int(self.offsets[chunk_index] + position)
+
+
+class AlignedArray:
+    """
+    Values of a signal looked up at the times of another time axis.
+
+    Made of one piece per file: (target times, source times, source values).
+    Source times None means the values already match the target times row
+    for row; source values None means the file has no data (NaN/NaT rows).
+    Rows are computed from their piece only when they are read, so slices
+    and timespan selections stay cheap views like ChunkedArray slices.
+    """
+
+    def __init__(self, pieces, dtype, method='previous'):
+        """
+        Args:
+            pieces (list): (target times, source times, source values) per file
+            dtype: dtype of the source values
+            method (str): 'previous' (last sample at or before each time) or
+                'linear' (interpolate, e.g. timestamps)
+        """
+        self.pieces = [piece for piece in pieces if len(piece[0]) > 0]
+        self.method = method
+        dtype = np.dtype(dtype)
+        if any(values is None for _, _, values in self.pieces) and dtype.kind not in "fcmM":
+            # Smallest float type holding the values, for the NaN rows
+            dtype = np.promote_types(dtype, np.float16)
+        self.dtype = dtype
+        self.offsets = np.zeros(len(self.pieces) + 1, dtype=np.int64)
+        np.cumsum([len(piece[0]) for piece in self.pieces], out=self.offsets[1:])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __repr__(self):
+        return f"AlignedArray(length={len(self)}, pieces={len(self.pieces)}, dtype={self.dtype})"
+
+    @property
+    def shape(self):
+        return (len(self),)
+
+    @property
+    def ndim(self):
+        return 1
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.to_numpy()
+        if dtype is not None:
+            array = array.astype(dtype, copy=False)
+        return array
+
+    def to_numpy(self):
+        """Compute all rows as one array"""
+        return _concatenate([chunk for _, _, chunk in self.chunk_ranges()], self.dtype)
+
+    def chunk_ranges(self):
+        """Yield (start, stop, values) per file piece, computing one piece at a time"""
+        for index, piece in enumerate(self.pieces):
+            yield int(self.offsets[index]), int(self.offsets[index + 1]), self._compute(*piece)
+
+    def _compute(self, target_time, source_time, values):
+        """Look up the values of one piece at its target times"""
+        if values is None:
+            missing = np.datetime64('NaT') if self.dtype.kind == 'M' else np.nan
+            return np.full(len(target_time), missing, dtype=self.dtype)
+        if source_time is None:
+            return np.asarray(values).astype(self.dtype, copy=False)
+
+        position = np.searchsorted(source_time, target_time, side='right') - 1
+        if self.method == 'previous' or len(values) == 1:
+            np.clip(position, 0, len(values) - 1, out=position)
+            return np.asarray(values[position]).astype(self.dtype, copy=False)
+
+        # Linear interpolation (and extrapolation at the edges)
+        np.clip(position, 0, len(values) - 2, out=position)
+        is_datetime = self.dtype.kind == 'M'
+        if is_datetime:
+            base = values[0]
+            values = (values - base).astype(np.int64).astype(np.float64)
+        left_time = source_time[position]
+        step = source_time[position + 1] - left_time
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.where(step != 0, (target_time - left_time) / step, 0.0)
+        result = values[position] + fraction * (values[position + 1] - values[position])
+        if is_datetime:
+            return base + np.round(result).astype(np.int64).astype('timedelta64[ns]')
+        return result.astype(self.dtype, copy=False)
+
+    def _slice_pieces(self, start, stop):
+        """Return the pieces restricted to rows [start, stop)"""
+        parts = []
+        first = int(np.searchsorted(self.offsets, start, side='right')) - 1
+        for index in range(max(first, 0), len(self.pieces)):
+            piece_start = int(self.offsets[index])
+            if piece_start >= stop:
+                break
+            target_time, source_time, values = self.pieces[index]
+            begin = max(start - piece_start, 0)
+            end = stop - piece_start
+            if source_time is None and values is not None:
+                values = values[begin:end]
+            parts.append((target_time[begin:end], source_time, values))
+        return parts
+
+    def slice_range(self, start, stop):
+        """Return rows [start, stop) as another AlignedArray (nothing is computed)"""
+        start = max(0, min(start, len(self)))
+        stop = max(start, min(stop, len(self)))
+        return AlignedArray(self._slice_pieces(start, stop), self.dtype, self.method)
+
+    def select(self, ranges):
+        """Return the rows in (start, stop) ranges as one AlignedArray"""
+        parts = []
+        for start, stop in ranges:
+            parts.extend(self._slice_pieces(start, stop))
+        return AlignedArray(parts, self.dtype, self.method)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                return self.slice_range(start, stop)
+        elif isinstance(key, (int, np.integer)):
+            index = int(key) + (len(self) if key < 0 else 0)
+            return self.slice_range(index, index + 1).to_numpy()[0]
+        return self.to_numpy()[key]
+
+
+def _concatenate(parts, dtype):
+    """Concatenate array parts, keeping dtype for an empty result"""
+    if not parts:
+        return np.empty(0, dtype=dtype)
+    if len(parts) == 1:
+        return parts[0]
+    return np.concatenate(parts).astype(dtype, copy=False)
+
+
+def find_ranges(x, lower=None, upper=None):
+    """
+    Find the samples with lower <= x <= upper by binary search.
+
+    Each chunk of x (one per file segment) must be in ascending order, as
+    time tracks and timestamps within a file are; chunks do not have to
+    continue each other. Each chunk is searched with np.searchsorted, so
+    the cost is O(log n) per chunk.
+
+    Args:
+        x (array-like): Time values (array or ChunkedArray)
+        lower: Smallest value to keep, or None
+        upper: Largest value to keep, or None
+
+    Returns:
+        list: (start, stop) index ranges into x, at most one per chunk
+    """
+    chunk_ranges = x.chunk_ranges() if hasattr(x, 'chunk_ranges') else [(0, len(x), np.asarray(x))]
+    ranges = []
+    for chunk_start, chunk_stop, chunk in chunk_ranges:
+        start = int(np.searchsorted(chunk, lower, side='left')) if lower is not None else 0
+        stop = int(np.searchsorted(chunk, upper, side='right')) if upper is not None else len(chunk)
+        if stop > start:
+            ranges.append((chunk_start + start, chunk_start + stop))
+    return ranges
+
+
+def parse_timespan(timespan_str):
+    """
+    Parse a timespan entry to a datetime or a numeric value.
+
+    Numbers are seconds (or indices), "HH:MM:SS[.f]" and "MM:SS[.f]" are
+    converted to seconds from midnight and "YYYY-MM-DD HH:MM:SS[.f]" gives
+    a datetime.
+
+    Returns:
+        datetime or float: Parsed value, or None if the text is empty or invalid
+    """
+    timespan_str = timespan_str.strip()
+    if not timespan_str:
+        return None
+
+    # Numeric values are the most common case for TDMS time data
+    try:
+        return float(timespan_str)
+    except ValueError:
+        pass
+
+    # Time of day formats are converted to seconds from midnight
+    for fmt in ("%H:%M:%S.%f", "%H:%M:%S", "%M:%S.%f", "%M:%S"):
+        try:
+            time_obj = datetime.strptime(timespan_str, fmt).time()
+            return time_obj.hour * 3600 + time_obj.minute * 60 + time_obj.second + time_obj.microsecond / 1000000
+        except ValueError:
+            continue
+
+    for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S"):
+        try:
+            return datetime.strptime(timespan_str, fmt)
+        except ValueError:
+            continue
+
+    return None
+
+
+def timespan_bounds(x, start_value=None, end_value=None):
+    """
+    Convert parsed timespan values to bounds comparable with x.
+
+    Numeric values are seconds; on datetime64 data they are relative to the
+    first sample. Datetimes cannot be compared with numeric time, so there
+    a datetime start means "from 0" and a datetime end means "no limit".
+
+    Args:
+        x (array-like): Time, index or datetime64 values
+        start_value: Parsed start (see parse_timespan) or None
+        end_value: Parsed end or None
+
+    Returns:
+        tuple: (lower, upper) for find_ranges(); None means unbounded
+    """
+    if np.issubdtype(x.dtype, np.datetime64):
+        reference_time = np.datetime64(x[0], 'ns')
+
+        def to_bound(value, default):
+            if isinstance(value, datetime):
+                return np.datetime64(value, 'ns')
+            if isinstance(value, (int, float)):
+                return reference_time + np.timedelta64(int(round(value * 1e9)), 'ns')
+            return default
+    else:
+        def to_bound(value, default):
+            if isinstance(value, (int, float)):
+                return float(value)
+            return default
+
+    lower = to_bound(start_value, 0.0) if start_value is not None else None
+    upper = to_bound(end_value, None) if end_value is not None else None
+    return lower, upper
+
+
+def select_ranges(data, ranges):
+    """
+    Return the samples in the given index ranges as a view.
+
+    Args:
+        data (array-like): Array or ChunkedArray
+        ranges (list): (start, stop) index ranges as returned by find_ranges()
+
+    Returns:
+        ChunkedArray: Slices of data; nothing is copied (an AlignedArray
+        stays an AlignedArray over the selected rows)
+    """
+    if isinstance(data, AlignedArray):
+        return data.select(ranges)
+    parts = []
+    for start, stop in ranges:
+        part = data[start:stop]
+        parts.extend(part.chunks if isinstance(part, ChunkedArray) else [part])
+    return ChunkedArray(parts, dtype=data.dtype)
+
+
+def scan_tdms_file(file_info, cache=None):
+    """
+    Record one file's contribution to each channel and to the time axis.
+
+    Only metadata is used; no channel samples are decoded.
+
+    Args:
+        file_info (dict): File entry as returned by open_tdms_file()
+        cache (DecodedChannelCache): Optional on-disk cache for time tracks
+            of lazily opened files
+
+    Returns:
+        dict: Segment with the file entry, the channels it contains (with
+        their sample counts) and its time chunks keyed by group name, each
+        ("Time", time track) or ("Index", sample count)
+    """
+    channels = {}
+    time_chunks = {}
+    with tdms_handle(file_info) as tdms_file:
+        _scan_groups(tdms_file, file_info, cache, channels, time_chunks)
+
+    return {
+        'file_info': file_info,
+        'channels': channels,
+        'time_chunks': time_chunks
+    }
+
+
+def _scan_groups(tdms_file, file_info, cache, channels, time_chunks):
+    """Fill the channels and time chunks of scan_tdms_file from an open file"""
+    for group in tdms_file.groups():
+        for channel_index, channel in enumerate(group.channels()):
+            # Time column is taken from the first channel of each group
+            if channel_index == 0:
+                try:
+                    if cache is not None and file_info['lazy']:
+                        time_track = cache.get_or_decode(file_info['path'], f"{channel.path}#time_track",
+                                                         channel.time_track)
+                    else:
+                        time_track = channel.time_track()
+                    time_chunks[group.name] = ("Time", time_track)
+                except (KeyError, AttributeError):
+                    # Fallback to index if no time track available; the
+                    # offset depends on the file order and is applied later
+                    if len(channel) > 0:
+                        time_chunks[group.name] = ("Index", len(channel))
+
+            channels[f"{group.name}/{channel.name}"] = {
+                'group_name': group.name,
+                'channel_name': channel.name,
+                'length': len(channel),
+                'data': None
+            }
+
+
+def segment_from_record(file_info, record):
+    """
+    Build a file segment (see scan_tdms_file) from a metadata index record.
+
+    The file does not need to be opened: time tracks are computed from the
+    indexed wf_start_offset/wf_increment properties the same way as
+    TdmsChannel.time_track() does.
+
+    Args:
+        file_info (dict): File entry, usually with a deferred file handle
+        record (dict): Record from TdmsMetadataIndex
+
+    Returns:
+        dict: Segment of the file
+    """
+    channels = {}
+    time_chunks = {}
+    seen_groups = set()
+    for channel in record['channels']:
+        group_name = channel['group_name']
+        length = channel['length']
+
+        # Time column is taken from the first channel of each group
+        if group_name not in seen_groups:
+            seen_groups.add(group_name)
+            offset = channel['wf_start_offset']
+            increment = channel['wf_increment']
+            if offset is not None and increment is not None:
+                time_chunks[group_name] = ("Time", np.linspace(offset, offset + (length - 1) * increment, length))
+            elif length > 0:
+                time_chunks[group_name] = ("Index", length)
+
+        channels[f"{group_name}/{channel['channel_name']}"] = {
+            'group_name': group_name,
+            'channel_name': channel['channel_name'],
+            'length': length,
+            'data': None
+        }
+
+    return {
+        'file_info': file_info,
+        'channels': channels,
+        'time_chunks': time_chunks
+    }
+
+
+class ChannelStore:
+    """
+    Combined channel data of several TDMS files kept as typed NumPy arrays.
+
+    Channels with the same group and channel name are treated as one
+    continuous channel across all files. Each file's contribution is kept
+    as a separate segment, so files can be added or removed without
+    touching channels they do not contain. Only metadata is collected when
+    files are added; the samples of a channel are decoded per file (keeping
+    the TDMS dtype) the first time it is requested and presented as a
+    ChunkedArray over the per-file arrays, so nothing is concatenated.
+
+    With a DecodedChannelCache, data of lazily opened files is read from
+    memory-mapped .npy files instead of being decoded again.
+
+    Every group has its own time axis (the time track of its first channel,
+    or a sample index), since groups may be sampled at different rates.
+    aligned() presents a channel on the time axis of another group, so
+    channels of different rates can be exported side by side.
+
+    With a memory budget, decoded channels are kept in least-recently-used
+    order and the oldest ones are dropped once the decoded bytes exceed the
+    budget; they are read again (from the disk cache or the TDMS file) the
+    next time they are requested. Pinned channels are never dropped.
+
+    Decoding, adding and removing files are serialized by one lock, so a
+    background export or preview can read channels while the GUI changes
+    the file list; a removed file is no longer read once remove_files()
+    returns, so its handle can be closed then.
+    """
+
+    def __init__(self, cache=None, memory_budget=None):
+        """
+        Args:
+            cache (DecodedChannelCache): Optional on-disk cache of decoded data
+            memory_budget (int): Bytes of decoded channel data to keep, or
+                None to keep every decoded channel
+        """
+        self.cache = cache
+        self.memory_budget = memory_budget
+        self._lock = threading.RLock()
+        # Channel id -> decoded bytes, least recently used first
+        self._resident = OrderedDict()
+        self.pinned = set()
+        self.channels = {}
+        # Display name ("Group - Channel") -> channel id
+        self.display_names = {}
+        self.segments = {}
+        self.file_order = []
+        self.time_column = None
+        self.time_column_name = None
+        # Group name -> (axis name, ChunkedArray) and per-file time chunks
+        self.time_axes = {}
+        self._group_time = {}
+        self._timestamps = None
+        self._timestamp_chunks = None
+
+    def clear(self):
+        """Forget all files, channels and the time column"""
+        with self._lock:
+            self._resident.clear()
+            self.channels.clear()
+            self.display_names.clear()
+            self.segments.clear()
+            self.file_order.clear()
+            self.time_column = None
+            self.time_column_name = None
+            self.time_axes = {}
+            self._group_time = {}
+            self._timestamps = None
+            self._timestamp_chunks = None
+
+    def load(self, tdms_files):
+        """
+        Replace the store contents with the channels of the given files.
+
+        Args:
+            tdms_files (list): File entries with 'path', 'name' and 'tdms_obj' keys
+
+        Returns:
+            dict: Channel information keyed by "Group/Channel" identifier
+        """
+        self.clear()
+        self.add_segments([scan_tdms_file(file_info, self.cache) for file_info in tdms_files])
+        return self.channels
+
+    def add_segments(self, segments):
+        """
+        Splice file segments (see scan_tdms_file) into the ordered dataset.
+
+        Files are ordered by their first MachineStatus timestamp when it is
+        known, otherwise by name (assuming chronological naming). Only the
+        channels contained in the new files are updated.
+
+        Args:
+            segments (list): Segments of files that are not in the store yet
+
+        Returns:
+            list: Identifiers of channels that did not exist before
+        """
+        with self._lock:
+            new_channel_ids = []
+            touched = set()
+
+            for segment in segments:
+                path = segment['file_info']['path']
+                if path in self.segments:
+                    continue
+
+                self.segments[path] = segment
+                keys = [file_order_key(self.segments[p]['file_info']) for p in self.file_order]
+                self.file_order.insert(bisect.bisect_right(keys, file_order_key(segment['file_info'])), path)
+
+                for channel_id, channel in segment['channels'].items():
+                    if channel_id not in self.channels:
+                        group_name = channel['group_name']
+                        channel_name = channel['channel_name']
+                        display_name = f"{group_name} - {channel_name}"
+                        self.display_names[display_name] = channel_id
+                        self.channels[channel_id] = {
+                            'display_name': display_name,
+                            'data': None,
+                            'sources': [],
+                            'group_name': group_name,
+                            'channel_name': channel_name,
+                            'files_count': 0
+                        }
+                        new_channel_ids.append(channel_id)
+                    touched.add(channel_id)
+
+            for channel_id in touched:
+                self._update_sources(channel_id)
+            if segments:
+                self._rebuild_time_column()
+
+            return new_channel_ids
+
+    def remove_files(self, paths):
+        """
+        Remove the segments of the given files from the dataset.
+
+        Args:
+            paths (list): Paths of the files to remove
+
+        Returns:
+            list: Identifiers of channels that no longer have any data
+        """
+        with self._lock:
+            touched = set()
+            for path in paths:
+                segment = self.segments.pop(path, None)
+                if segment is None:
+                    continue
+                self.file_order.remove(path)
+                touched.update(segment['channels'])
+
+            removed_channel_ids = []
+            for channel_id in touched:
+                self._update_sources(channel_id)
+                if not self.channels[channel_id]['sources']:
+                    del self.display_names[self.channels[channel_id]['display_name']]
+                    del self.channels[channel_id]
+                    self._resident.pop(channel_id, None)
+                    removed_channel_ids.append(channel_id)
+            if touched:
+                self._rebuild_time_column()
+
+            return removed_channel_ids
+
+    def _update_sources(self, channel_id):
+        """Refresh the ordered file list of a channel and drop its combined view"""
+        channel_info = self.channels[channel_id]
+        channel_info['sources'] = [
+            self.segments[path]['file_info']
+            for path in self.file_order
+            if channel_id in self.segments[path]['channels']
+        ]
+        channel_info['files_count'] = len(channel_info['sources'])
+        channel_info['data'] = None
+        if channel_id in self._resident:
+            self._resident[channel_id] = self._decoded_bytes(channel_id)
+
+    def _rebuild_time_column(self):
+        """
+        Concatenate the time chunks of every group in file order.
+
+        time_column is the axis of the reference group (see
+        reference_group), kept for callers that need one dataset time axis.
+        """
+        self.time_column = None
+        self.time_column_name = None
+        self.time_axes = {}
+        self._group_time = {}
+        self._timestamps = None
+        self._timestamp_chunks = None
+
+        names = {}
+        for path in self.file_order:
+            for group_name, (name, chunk) in self.segments[path]['time_chunks'].items():
+                group_time = self._group_time.setdefault(group_name, {})
+                if name == "Index":
+                    # Index axes continue over the files containing the group
+                    length = sum(len(previous) for previous in group_time.values())
+                    chunk = np.arange(length, length + chunk)
+                names.setdefault(group_name, name)
+                group_time[path] = chunk
+
+        for group_name, group_time in self._group_time.items():
+            self.time_axes[group_name] = (names[group_name], ChunkedArray(list(group_time.values())))
+
+        reference = self.reference_group()
+        if reference is not None:
+            self.time_column_name, self.time_column = self.time_axes[reference]
+
+    def reference_group(self):
+        """
+        Return the group whose time axis is the dataset time column: the
+        group of the timestamp channel if there is one, else the first
+        group with a time axis (or None).
+        """
+        channel_id = self.find_channel("MachineStatus", "Timestamp")
+        if channel_id is not None and self.channels[channel_id]['group_name'] in self.time_axes:
+            return self.channels[channel_id]['group_name']
+        return next(iter(self.time_axes), None)
+
+    def time_axis(self, channel_id):
+        """
+        Return the time axis of a channel's group.
+
+        Returns:
+            tuple: (axis name, ChunkedArray), or None if the group has no
+            time axis or the channel has a different number of samples
+        """
+        with self._lock:
+            channel_info = self.channels.get(channel_id)
+            if channel_info is None:
+                return None
+            axis = self.time_axes.get(channel_info['group_name'])
+            if axis is None or len(axis[1]) != self.channel_length(channel_id):
+                return None
+            return axis
+
+    def channel_length(self, channel_id):
+        """Return the sample count of a channel over all files (from metadata, nothing is decoded)"""
+        with self._lock:
+            return sum(self.segments[file_info['path']]['channels'][channel_id]['length']
+                       for file_info in self.channels[channel_id]['sources'])
+
+    def get(self, channel_id):
+        """
+        Return the combined data of a channel, decoding it on first use.
+
+        Args:
+            channel_id (str): Channel identifier in "Group/Channel" form
+
+        Returns:
+            ChunkedArray: Samples of all files in file order, or None if
+            the channel does not exist
+        """
+        with self._lock:
+            # Looked up under the lock, so a channel of removed files is
+            # never decoded (which would reopen their closed handles)
+            channel_info = self.channels.get(channel_id)
+            if channel_info is None:
+                return None
+
+            if channel_info['data'] is None:
+                chunks = []
+                for file_info in channel_info['sources']:
+                    # Decoded arrays are kept per file segment, so adding a file
+                    # only decodes that file's part of the channel
+                    segment_channel = self.segments[file_info['path']]['channels'][channel_id]
+                    if segment_channel['data'] is None:
+                        segment_channel['data'] = self._decode(file_info, channel_info)
+                    chunks.append(segment_channel['data'])
+                channel_info['data'] = ChunkedArray(chunks)
+                self._resident[channel_id] = self._decoded_bytes(channel_id)
+
+            self._resident.move_to_end(channel_id)
+            data = channel_info['data']
+            self._evict(keep=channel_id)
+            return data
+
+    def resident_bytes(self):
+        """Return the bytes of decoded channel data currently kept"""
+        return sum(self._resident.values())
+
+    def pin(self, channel_ids):
+        """
+        Set the channels that must stay decoded (e.g. the selected and
+        previewed ones), replacing the previous pinned set.
+
+        Never waits for a running decode (see _evict_if_idle), so the GUI
+        thread can call it on every selection change.
+        """
+        self.pinned = set(channel_ids)
+        self._evict_if_idle()
+
+    def set_memory_budget(self, memory_budget):
+        """
+        Change the memory budget (bytes, None for unlimited) and drop
+        channels above it, without waiting for a running decode.
+        """
+        self.memory_budget = memory_budget
+        self._evict_if_idle()
+
+    def _evict_if_idle(self):
+        """Evict now unless another thread is decoding; its get() evicts when it finishes"""
+        if self._lock.acquire(blocking=False):
+            try:
+                self._evict()
+            finally:
+                self._lock.release()
+
+    def _decoded_bytes(self, channel_id):
+        """Return the bytes of a channel's decoded file segments"""
+        total = 0
+        for file_info in self.channels[channel_id]['sources']:
+            data = self.segments[file_info['path']]['channels'][channel_id]['data']
+            if data is not None:
+                total += data.nbytes
+        return total
+
+    def _evict(self, keep=None):
+        """Drop least recently used, unpinned channels until the decoded data fits the budget"""
+        if self.memory_budget is None:
+            return
+        total = self.resident_bytes()
+        for channel_id in list(self._resident):
+            if total <= self.memory_budget:
+                break
+            if channel_id == keep or channel_id in self.pinned:
+                continue
+            total -= self._resident.pop(channel_id)
+            channel_info = self.channels[channel_id]
+            channel_info['data'] = None
+            for file_info in channel_info['sources']:
+                self.segments[file_info['path']]['channels'][channel_id]['data'] = None
+
+    def _decode(self, file_info, channel_info):
+        """
+        Read one file's part of a channel, through the disk cache for lazy files.
+
+        The file is only opened on a cache miss, so a file added from the
+        metadata index whose channels are cached takes no handle at all.
+        """
+        group_name = channel_info['group_name']
+        channel_name = channel_info['channel_name']
+
+        def read_channel():
+            with tdms_handle(file_info) as tdms_file:
+                return tdms_file[group_name][channel_name][:]
+
+        if self.cache is None or not file_info['lazy']:
+            return read_channel()
+        # Same path as TdmsChannel.path, without opening the file
+        channel_path = str(ObjectPath(group_name, channel_name))
+        return self.cache.get_or_decode(file_info['path'], channel_path, read_channel)
+
+    def timestamps(self, group_part="MachineStatus", channel_part="Timestamp"):
+        """
+        Return the calculated timestamps of the dataset.
+
+        The Excel serial dates of the timestamp channel are converted to
+        datetime64[ns] once per file segment and kept until files are added
+        or removed.
+
+        Returns:
+            ChunkedArray: datetime64[ns] timestamps in file order, or None if
+            there is no timestamp channel
+        """
+        with self._lock:
+            if self._timestamps is None:
+                channel_id = self.find_channel(group_part, channel_part)
+                if channel_id is None:
+                    return None
+                self.get(channel_id)
+                self._timestamp_chunks = {}
+                for file_info in self.channels[channel_id]['sources']:
+                    segment_channel = self.segments[file_info['path']]['channels'][channel_id]
+                    self._timestamp_chunks[file_info['path']] = excel_serial_to_datetime64(segment_channel['data'])
+                self._timestamps = ChunkedArray(list(self._timestamp_chunks.values()), dtype='datetime64[ns]')
+            return self._timestamps
+
+    def aligned(self, channel_id, target_group):
+        """
+        Return a channel on the time axis of another group.
+
+        Within every file, each time of the target axis takes the channel's
+        last sample at or before that time (previous-sample join by binary
+        search); before the first sample the first value is used. Rows of
+        files without the channel are NaN. The samples are looked up when
+        rows are read, so nothing the size of the target axis is allocated.
+
+        Args:
+            channel_id (str): Channel identifier
+            target_group (str): Group whose time axis the rows follow
+
+        Returns:
+            ChunkedArray or AlignedArray: The channel itself if it already
+            has the target group's samples, else an AlignedArray
+        """
+        with self._lock:
+            # Collected under the lock so the segments cannot be evicted or
+            # removed in between
+            data = self.get(channel_id)
+            if data is None or target_group not in self._group_time:
+                return data
+            chunks = {file_info['path']: self.segments[file_info['path']]['channels'][channel_id]['data']
+                      for file_info in self.channels[channel_id]['sources']}
+            return self._align(chunks, self.channels[channel_id]['group_name'], target_group, data, 'previous')
+
+    def aligned_timestamps(self, target_group):
+        """
+        Return the calculated timestamps on the time axis of a group.
+
+        Timestamps are interpolated linearly between (and extrapolated
+        beyond) the timestamp channel's samples within every file.
+
+        Returns:
+            ChunkedArray or AlignedArray: datetime64[ns] values, or None if
+            there is no timestamp channel
+        """
+        with self._lock:
+            timestamps = self.timestamps()
+            if timestamps is None or target_group not in self._group_time:
+                return timestamps
+            channel_id = self.find_channel("MachineStatus", "Timestamp")
+            return self._align(self._timestamp_chunks, self.channels[channel_id]['group_name'], target_group,
+                               timestamps, 'linear')
+
+    def _align(self, chunks, source_group, target_group, data, method):
+        """Build the per-file pieces of a channel (chunks keyed by path) on the target group's axis"""
+        # Sample times are only comparable if both groups have time tracks;
+        # against a sample index, samples are matched by position instead
+        timed = self.time_axes[target_group][0] == "Time" and self.time_axes.get(source_group, ("Index",))[0] == "Time"
+        source_time = self._group_time.get(source_group, {}) if timed else {}
+        pieces = []
+        direct = True
+        for path, target_time in self._group_time[target_group].items():
+            values = chunks.get(path)
+            if values is None or len(values) == 0:
+                pieces.append((target_time, None, None))
+                direct = False
+                continue
+            if (source_group == target_group or not timed) and len(values) == len(target_time):
+                pieces.append((target_time, None, values))
+                continue
+
+            direct = False
+            times = source_time.get(path)
+            if times is None or len(times) != len(values):
+                # No comparable time track of the channel's own length:
+                # spread its samples evenly over the file's time span
+                span = times if times is not None and len(times) > 0 else target_time
+                times = np.linspace(span[0], span[-1], len(values))
+            if method == 'linear' and np.issubdtype(values.dtype, np.datetime64):
+                valid = ~np.isnat(values)
+                if not valid.any():
+                    pieces.append((target_time, None, None))
+                    continue
+                times, values = times[valid], values[valid]
+            pieces.append((target_time, times, values))
+
+        if direct and len(pieces) == len(chunks):
+            return data
+        return AlignedArray(pieces, data.dtype, method)
+
+    def channel_id(self, display_name):
+        """Return the id of the channel with the given display name, or None"""
+        return self.display_names.get(display_name)
+
+    def find_channel(self, group_part, channel_part):
+        """Return the id of the first channel whose group and name contain the given parts"""
+        for channel_id, channel_info in self.channels.items():
+            if group_part in channel_info['group_name'] and channel_part in channel_info['channel_name']:
+                return channel_id
+        return None
+
+
+class ChannelSelection:
+    """
+    Ordered set of selected channel display names.
+
+    The selection is kept in an insertion-ordered dict, so adding, removing
+    and membership tests are O(1) per channel and restoring or extending a
+    selection of n channels is O(n). The selected channels listbox only
+    mirrors this model.
+    """
+
+    def __init__(self, names=()):
+        self._names = dict.fromkeys(names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def names(self):
+        """Return the selected names in selection order"""
+        return list(self._names)
+
+    def first(self):
+        """Return the first selected name, or None"""
+        return next(iter(self._names), None)
+
+    def last(self):
+        """Return the last selected name, or None"""
+        return next(reversed(self._names), None) if self._names else None
+
+    def add(self, names):
+        """
+        Append names that are not selected yet.
+
+        Returns:
+            list: The names that were added
+        """
+        added = [name for name in names if name not in self._names]
+        self._names.update(dict.fromkeys(added))
+        return added
+
+    def remove(self, names):
+        """Remove names from the selection (unknown names are ignored)"""
+        for name in names:
+            self._names.pop(name, None)
+
+    def retain(self, available):
+        """
+        Keep only names contained in available (a set or dict).
+
+        Returns:
+            list: The names that were removed
+        """
+        removed = [name for name in self._names if name not in available]
+        self.remove(removed)
+        return removed
+
+    def clear(self):
+        """Remove all names"""
+        self._names.clear()
+
+
+class ChannelSearchIndex:
+    """
+    Search index over channel display names for the channel filter.
+
+    Lowercase names are computed once. A query is matched as:
+
+    - a regular expression if it starts with "re:" (case-insensitive search)
+    - a glob if it contains *, ? or [ (case-insensitive, whole name)
+    - otherwise whitespace-separated terms that must all be substrings
+
+    Substring queries narrow incrementally: when every term of the previous
+    query is contained in a term of the new one (e.g. while typing), only
+    the previous matches are searched again.
+    """
+
+    def __init__(self, names):
+        """
+        Args:
+            names (list): Display names in display order
+        """
+        self.names = list(names)
+        self.lower_names = [name.lower() for name in self.names]
+        self._last_terms = None
+        self._last_matches = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query):
+        """
+        Return the names matching a query, in display order.
+
+        Raises:
+            re.error: If a "re:" query is not a valid regular expression
+        """
+        query = query.strip()
+        if query.lower().startswith("re:"):
+            pattern = re.compile(query[3:].strip(), re.IGNORECASE)
+            return self._remember(None, [i for i, name in enumerate(self.names) if pattern.search(name)])
+
+        query = query.lower()
+        if any(char in query for char in "*?["):
+            pattern = re.compile(fnmatch.translate(query))
+            return self._remember(None, [i for i, name in enumerate(self.lower_names) if pattern.match(name)])
+
+        terms = query.split()
+        if not terms:
+            return self._remember(terms, range(len(self.names)))
+
+        lower_names = self.lower_names
+        if self._last_terms and all(any(old in new for new in terms) for old in self._last_terms):
+            matches = self._last_matches
+        else:
+            matches = range(len(self.names))
+        # Narrow term by term; each pass only scans the previous matches
+        for term in terms:
+            matches = [i for i in matches if term in lower_names[i]]
+        return self._remember(terms, matches)
+
+    def _remember(self, terms, matches):
+        """Keep the matches of a substring query for narrowing and return the names"""
+        self._last_terms = terms
+        self._last_matches = matches
+        return [self.names[i] for i in matches]
@@ -0,0 +1,277 @@
+"""Vectorized min/max decimation of signals for plotting."""
+import numpy as np
+
+
+def m4_indices(y, n_buckets):
+    """
+    Return the sample indices kept by M4 decimation.
+
+    The samples are split into n_buckets equally sized buckets and the
+    first, last, minimum and maximum sample of every bucket is kept, so
+    every extreme (e.g. a short spike) stays visible at plot resolution.
+    The work is O(n) and done with NumPy reductions only.
+
+    Args:
+        y (array-like): Signal values
+        n_buckets (int): Number of buckets (roughly one per plot pixel)
+
+    Returns:
+        numpy.ndarray: Sorted unique indices into y (at most 4 per bucket)
+    """
+    y = np.asarray(y)
+    n = len(y)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    n_buckets = max(1, min(int(n_buckets), n))
+    if n <= 4 * n_buckets:
+        return np.arange(n)
+
+    # Pad with the last value so the data reshapes into equal buckets; an
+    # extreme found in the padding is the last sample itself
+    bucket_size = -(-n // n_buckets)
+    n_buckets = -(-n // bucket_size)
+    padded = np.pad(y, (0, n_buckets * bucket_size - n), mode='edge')
+    buckets = padded.reshape(n_buckets, bucket_size)
+
+    starts = np.arange(n_buckets) * bucket_size
+    indices = np.empty((n_buckets, 4), dtype=np.int64)
+    indices[:, 0] = starts
+    indices[:, 1] = starts + np.argmin(buckets, axis=1)
+    indices[:, 2] = starts + np.argmax(buckets, axis=1)
+    indices[:, 3] = np.minimum(starts + bucket_size, n) - 1
+    np.minimum(indices, n - 1, out=indices)
+
+    # Rows are increasing, so sorting within rows sorts the whole array
+    indices.sort(axis=1)
+    indices = indices.ravel()
+    keep = np.empty(len(indices), dtype=bool)
+    keep[0] = True
+    np.not_equal(indices[1:], indices[:-1], out=keep[1:])
+    return indices[keep]
+
+
+def m4_decimate(x, y, n_buckets):
+    """
+    Reduce a signal with M4 (first/min/max/last per bucket) decimation.
+
+    Args:
+        x (array-like): X values (time, index or datetime64), same length as y
+        y (array-like): Signal values
+        n_buckets (int): Number of buckets; the result has at most
+            4 * n_buckets points
+
+    Returns:
+        tuple: (x, y) arrays of the kept samples
+    """
+    y = np.asarray(y)
+    indices = m4_indices(y, n_buckets)
+    # x may be a ChunkedArray; only the kept samples are gathered from it
+    return x[indices], y[indices]
+
+
+def m4_indices_shared(ys, n_buckets, start=0, stop=None, block_size=1 << 22):
+    """
+    Return M4 sample indices of several equally long signals in one pass.
+
+    All signals share one bucket layout over [start, stop), computed once;
+    each block of buckets is copied into one (signals, buckets, bucket size)
+    buffer and reduced with one argmin and one argmax for all signals at
+    once. The first and last sample of every bucket are the same for all
+    signals.
+
+    Args:
+        ys (list): Signals (arrays or ChunkedArrays) of equal length
+        n_buckets (int): Number of buckets (roughly one per plot pixel)
+        start (int): First sample of the range
+        stop (int): End (exclusive) of the range (default: all samples)
+        block_size (int): Samples (of all signals together) read at a time
+
+    Returns:
+        numpy.ndarray: (len(ys), m) array of ascending indices into each
+        signal, 4 per bucket (repeated where first/min/max/last coincide)
+    """
+    stop = len(ys[0]) if stop is None else stop
+    n = max(0, stop - start)
+    n_buckets = max(1, min(int(n_buckets), max(n, 1)))
+    if n <= 4 * n_buckets:
+        return np.tile(np.arange(start, stop, dtype=np.int64), (len(ys), 1))
+
+    bucket_size = -(-n // n_buckets)
+    n_buckets = -(-n // bucket_size)
+    starts = start + np.arange(n_buckets, dtype=np.int64) * bucket_size
+    indices = np.empty((len(ys), n_buckets, 4), dtype=np.int64)
+    indices[:, :, 0] = starts
+    indices[:, :, 3] = np.minimum(starts + bucket_size, stop) - 1
+
+    # One reusable (signals, samples) buffer; block_size bounds its total size
+    buckets_per_block = min(n_buckets, max(1, block_size // (bucket_size * len(ys))))
+    dtype = np.result_type(*[y.dtype for y in ys])
+    buffer = np.empty((len(ys), buckets_per_block * bucket_size), dtype=dtype)
+    for first in range(0, n_buckets, buckets_per_block):
+        last = min(first + buckets_per_block, n_buckets)
+        block_start = start + first * bucket_size
+        block_stop = min(start + last * bucket_size, stop)
+        width = block_stop - block_start
+        for row, y in enumerate(ys):
+            buffer[row, :width] = y[block_start:block_stop]
+            # Pad with the last value; an extreme found in the padding is
+            # the last sample itself
+            buffer[row, width:(last - first) * bucket_size] = buffer[row, width - 1]
+        buckets = buffer[:, :(last - first) * bucket_size].reshape(len(ys), last - first, bucket_size)
+        indices[:, first:last, 1] = starts[first:last] + np.argmin(buckets, axis=2)
+        indices[:, first:last, 2] = starts[first:last] + np.argmax(buckets, axis=2)
+
+    np.minimum(indices, stop - 1, out=indices)
+    # Buckets are increasing, so sorting within buckets sorts every row
+    indices.sort(axis=2)
+    return indices.reshape(len(ys), -1)
+
+
+def is_sorted(x, block_size=1 << 20):
+    """
+    Check that x is in ascending order without a full-size temporary.
+
+    Args:
+        x (array-like): Numeric or datetime64 values (array or ChunkedArray)
+        block_size (int): Number of samples compared at a time
+
+    Returns:
+        bool: True if every sample is >= the previous one
+    """
+    n = len(x)
+    for start in range(0, max(n - 1, 0), block_size):
+        block = np.asarray(x[start:min(start + block_size + 1, n)])
+        if not np.all(block[1:] >= block[:-1]):
+            return False
+    return True
+
+
+class MinMaxPyramid:
+    """
+    Multi-resolution min/max summary of a signal for zoomable plots.
+
+    Level k stores, for every bucket of 2**(base_level + k) samples, the
+    index of its minimum and of its maximum. Each level is built from the
+    one below by pairwise comparison, so construction is O(n) and the
+    pyramid takes about n / 2**base_level index pairs. Any visible range
+    can then be decimated from the level whose buckets best match the plot
+    resolution, touching only ~n_buckets entries instead of the raw data.
+    """
+
+    def __init__(self, y, base_level=6, block_size=1 << 22):
+        """
+        Build the pyramid.
+
+        Args:
+            y (array-like): Signal values (array or ChunkedArray); kept as a
+                reference for decimating ranges finer than the base level
+            base_level (int): log2 of the samples per bucket of the finest level
+            block_size (int): Samples read at a time while building the
+                finest level (rounded to whole buckets)
+        """
+        self.y = y
+        self.length = len(y)
+        self.base_size = 1 << base_level
+        index_dtype = np.int32 if self.length < 2 ** 31 else np.int64
+
+        # Finest level: reduce the raw samples block by block so a chunked or
+        # memory-mapped signal is never copied as a whole
+        block_size = max(self.base_size, block_size - block_size % self.base_size)
+        mins, maxs, min_idx, max_idx = [], [], [], []
+        for start in range(0, self.length, block_size):
+            values = np.asarray(y[start:min(start + block_size, self.length)])
+            n_buckets = -(-len(values) // self.base_size)
+            padded = np.pad(values, (0, n_buckets * self.base_size - len(values)), mode='edge')
+            buckets = padded.reshape(n_buckets, self.base_size)
+            starts = np.arange(n_buckets) * self.base_size
+            argmin = np.argmin(buckets, axis=1)
+            argmax = np.argmax(buckets, axis=1)
+            mins.append(buckets[np.arange(n_buckets), argmin])
+            maxs.append(buckets[np.arange(n_buckets), argmax])
+            # Extremes found in the padding are the last sample itself
+            last = len(values) - 1
+            min_idx.append(start + np.minimum(starts + argmin, last))
+            max_idx.append(start + np.minimum(starts + argmax, last))
+
+        if not mins:
+            self.levels = []
+            return
+        mins = np.concatenate(mins)
+        maxs = np.concatenate(maxs)
+        min_idx = np.concatenate(min_idx).astype(index_dtype)
+        max_idx = np.concatenate(max_idx).astype(index_dtype)
+
+        # Coarser levels: merge neighbouring bucket pairs
+        self.levels = [(self.base_size, min_idx, max_idx)]
+        bucket_size = self.base_size
+        while len(min_idx) > 1:
+            if len(min_idx) % 2:
+                mins, maxs = np.append(mins, mins[-1]), np.append(maxs, maxs[-1])
+                min_idx, max_idx = np.append(min_idx, min_idx[-1]), np.append(max_idx, max_idx[-1])
+            take_right = mins[1::2] < mins[0::2]
+            mins = np.where(take_right, mins[1::2], mins[0::2])
+            min_idx = np.where(take_right, min_idx[1::2], min_idx[0::2])
+            take_right = maxs[1::2] > maxs[0::2]
+            maxs = np.where(take_right, maxs[1::2], maxs[0::2])
+            max_idx = np.where(take_right, max_idx[1::2], max_idx[0::2])
+            bucket_size *= 2
+            self.levels.append((bucket_size, min_idx, max_idx))
+
+    @property
+    def nbytes(self):
+        """Memory used by the stored index levels"""
+        return sum(min_idx.nbytes + max_idx.nbytes for _, min_idx, max_idx in self.levels)
+
+    def level_for(self, start, stop, n_buckets):
+        """
+        Return the bucket size used to decimate [start, stop), or 1 if the
+        range is decimated from the raw samples.
+        """
+        samples_per_bucket = (stop - start) / max(1, n_buckets)
+        bucket_size = 1
+        for size, _, _ in self.levels:
+            if size > samples_per_bucket:
+                break
+            bucket_size = size
+        return bucket_size
+
+    def indices(self, start, stop, n_buckets):
+        """
+        Return the sample indices to plot for the range [start, stop).
+
+        Args:
+            start (int): First sample of the visible range
+            stop (int): End (exclusive) of the visible range
+            n_buckets (int): Number of buckets (roughly one per plot pixel);
+                about 2 * n_buckets to 4 * n_buckets indices are returned
+
+        Returns:
+            numpy.ndarray: Sorted unique indices into y, always including
+            the first and last sample of the range
+        """
+        start = max(0, int(start))
+        stop = min(self.length, int(stop))
+        if stop <= start:
+            return np.zeros(0, dtype=np.int64)
+        if stop - start <= 4 * n_buckets:
+            return np.arange(start, stop)
+
+        bucket_size = self.level_for(start, stop, n_buckets)
+        if bucket_size == 1:
+            # Range is finer than the base level: M4 on the raw samples
+            return start + m4_indices(self.y[start:stop], n_buckets)
+
+        _, min_idx, max_idx = next(level for level in self.levels if level[0] == bucket_size)
+        first_bucket = -(-start // bucket_size)
+        last_bucket = stop // bucket_size
+        parts = [np.array([start, stop - 1], dtype=np.int64),
+                 min_idx[first_bucket:last_bucket], max_idx[first_bucket:last_bucket]]
+
+        # Partial buckets at the range edges are reduced from the raw samples
+        for edge_start, edge_stop in ((start, min(first_bucket * bucket_size, stop)),
+                                      (max(last_bucket * bucket_size, start), stop)):
+            if edge_stop > edge_start:
+                values = np.asarray(self.y[edge_start:edge_stop])
+                parts.append(edge_start + np.array([np.argmin(values), np.argmax(values)]))
+
+        return np.unique(np.concatenate([np.asarray(part, dtype=np.int64) for part in parts]))
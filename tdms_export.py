@@ -0,0 +1,805 @@
+"""Streaming export of channel data, independent of the GUI."""
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from tdms_data import format_timestamps, select_ranges, find_ranges, timespan_bounds
+
+# Optional dependencies for the binary export formats
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+try:
+    import tables
+except ImportError:
+    tables = None
+
+# Rows formatted and written at a time
+DEFAULT_BLOCK_ROWS = 1_000_000
+
+# Processes formatting CSV blocks in parallel
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+# Export formats: key -> (description, file extension)
+EXPORT_FORMATS = {
+    'csv': ("CSV", ".csv"),
+    'parquet': ("Apache Parquet", ".parquet"),
+    'feather': ("Feather", ".feather"),
+    'hdf5': ("HDF5", ".h5"),
+    'npz': ("NumPy archive", ".npz")
+}
+
+# Compression codecs offered for Parquet
+PARQUET_COMPRESSIONS = ("snappy", "zstd", "gzip", "brotli", "lz4", "none")
+
+# Per-bucket aggregations of resampled exports
+RESAMPLE_AGGREGATIONS = ("mean", "min", "max", "last")
+
+
+class ExportCancelled(Exception):
+    """Raised when an export is cancelled through its cancel event"""
+
+
+def format_available(export_format):
+    """Return True if the libraries needed for an export format are installed"""
+    if export_format in ('parquet', 'feather'):
+        return pa is not None
+    if export_format == 'hdf5':
+        return tables is not None
+    return export_format in EXPORT_FORMATS
+
+
+def format_from_path(file_path, default='csv'):
+    """Return the export format matching a file extension, or the default"""
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".hdf5":
+        return 'hdf5'
+    for export_format, (_, format_extension) in EXPORT_FORMATS.items():
+        if extension == format_extension:
+            return export_format
+    return default
+
+
+def export_column_name(channel_info, include_group_names=True):
+    """
+    Return the export column name of a channel.
+
+    Args:
+        channel_info (dict): Channel entry of a ChannelStore
+        include_group_names (bool): Use "Group_Channel" instead of "Channel"
+
+    Returns:
+        str: Name with "/", " ", "." and "-" replaced by "_"
+    """
+    name = channel_info['display_name'] if include_group_names else channel_info['channel_name']
+    return name.replace("/", "_").replace(" ", "_").replace(".", "_").replace("-", "_")
+
+
+def build_export_columns(store, channel_ids, include_time=True, include_timestamp=False,
+                         include_group_names=True):
+    """
+    Assemble the export columns of a channel store.
+
+    Args:
+        store (ChannelStore): Loaded dataset
+        channel_ids (list): Identifiers of the channels to export, in column order
+        include_time (bool): Add the time/index column first
+        include_timestamp (bool): Add the calculated timestamp (datetime64) column
+        include_group_names (bool): Prefix channel columns with their group name
+
+    Channels of groups sampled at different rates are aligned onto the time
+    axis of the export group (see export_time_group): every row holds each
+    channel's last sample at or before the row's time, and the calculated
+    timestamp is interpolated.
+
+    Returns:
+        dict: Column name -> ChunkedArray or AlignedArray, in output order
+    """
+    group = export_time_group(store, channel_ids)
+    columns = {}
+    if include_time:
+        if group is not None:
+            name, axis = store.time_axes[group]
+            columns[name] = axis
+        elif store.time_column is not None:
+            columns[store.time_column_name] = store.time_column
+
+    if include_timestamp:
+        timestamps = store.aligned_timestamps(group) if group is not None else store.timestamps()
+        if timestamps is not None:
+            columns["Calculated_Timestamp"] = timestamps
+
+    for channel_id in channel_ids:
+        data = store.aligned(channel_id, group) if group is not None else store.get(channel_id)
+        columns[export_column_name(store.channels[channel_id], include_group_names)] = data
+    return columns
+
+
+def export_time_group(store, channel_ids):
+    """
+    Return the group whose time axis an export follows: the group with the
+    most samples among the selected channels' groups, so no samples of the
+    fastest channels are lost. On ties the dataset's reference group (see
+    ChannelStore.reference_group) wins, then the first selected.
+
+    Returns:
+        str: Group name, or None if no selected channel has a time axis
+    """
+    groups = [store.channels[channel_id]['group_name'] for channel_id in channel_ids]
+    reference = store.reference_group()
+    if reference in groups:
+        groups.insert(0, reference)
+    best = None
+    best_length = -1
+    for group in groups:
+        axis = store.time_axes.get(group)
+        if axis is not None and len(axis[1]) > best_length:
+            best = group
+            best_length = len(axis[1])
+    return best
+
+
+def apply_ranges(columns, ranges, length):
+    """
+    Restrict the columns of a given length to index ranges.
+
+    Args:
+        columns (dict): Column name -> array or ChunkedArray
+        ranges (list): (start, stop) ranges (see tdms_data.find_ranges)
+        length (int): Length of the time axis the ranges refer to; columns
+            of another length are kept as they are
+
+    Returns:
+        dict: Columns as slice views
+    """
+    return {
+        name: select_ranges(column, ranges) if len(column) == length else column
+        for name, column in columns.items()
+    }
+
+
+def bucket_starts(key, interval, block_rows=DEFAULT_BLOCK_ROWS):
+    """
+    Split a time axis into fixed-interval buckets.
+
+    A bucket is a run of rows whose key falls in the same interval
+    [k * interval, (k + 1) * interval); a new bucket also starts wherever
+    the key jumps back, e.g. where the time track of the next file restarts.
+
+    Args:
+        key: Time axis (seconds, sample index or datetime64) to bucket on
+        interval (float): Bucket width in seconds (samples for an index)
+        block_rows (int): Rows of the key read at a time
+
+    Returns:
+        tuple: (first row of every bucket as an int64 array, bucket start
+        times with the key's dtype; NaT for buckets of invalid timestamps)
+    """
+    if interval <= 0:
+        raise ValueError(f"Resampling interval must be positive: {interval}")
+    is_datetime = np.issubdtype(key.dtype, np.datetime64)
+    step = np.int64(round(interval * 1e9)) if is_datetime else interval
+    if is_datetime and step <= 0:
+        raise ValueError(f"Resampling interval too small: {interval}")
+
+    starts, labels = [], []
+    previous = None
+    for start in range(0, len(key), block_rows):
+        values = np.asarray(key[start:start + block_rows])
+        if is_datetime:
+            values = values.astype('datetime64[ns]', copy=False)
+            buckets = values.view(np.int64) // step
+        else:
+            buckets = np.floor_divide(values, step)
+
+        # Rows where the bucket changes, including at the block edge
+        positions = np.flatnonzero(buckets[1:] != buckets[:-1]) + 1
+        if previous is None or buckets[0] != previous:
+            positions = np.concatenate(([0], positions))
+        previous = buckets[-1]
+
+        starts.append(positions + start)
+        if is_datetime:
+            first = values[positions]
+            label = (buckets[positions] * step).view('datetime64[ns]')
+            labels.append(np.where(np.isnat(first), first, label))
+        else:
+            labels.append((buckets[positions] * step).astype(np.result_type(values.dtype, type(step)), copy=False))
+
+    if not starts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=key.dtype)
+    return np.concatenate(starts).astype(np.int64, copy=False), np.concatenate(labels)
+
+
+class _BucketSource:
+    """
+    Reads a column bucket-wise; the aggregations of the same buckets share
+    one read, which is released once every aggregation has used it.
+    """
+
+    def __init__(self, column, starts, length):
+        self.column = column
+        self.starts = starts
+        self.length = length
+        self.readers = 0
+        self._cached = None
+        self._reads = 0
+
+    def read(self, first, last):
+        """Return (values, bucket offsets into values) for buckets [first, last)"""
+        if self._cached is None or self._cached[0] != (first, last):
+            row_start = int(self.starts[first])
+            row_stop = int(self.starts[last]) if last < len(self.starts) else self.length
+            values = np.asarray(self.column[row_start:row_stop])
+            self._cached = ((first, last), values, self.starts[first:last] - row_start)
+            self._reads = 0
+        cached = self._cached
+        self._reads += 1
+        if self._reads >= self.readers:
+            self.release()
+        return cached[1], cached[2]
+
+    def release(self):
+        """Drop the shared read, e.g. when columns are written one after another"""
+        self._cached = None
+
+
+class ResampledArray:
+    """
+    One aggregation ('mean', 'min', 'max', 'last' or 'first') of a column
+    per bucket, computed with vectorized bucket reductions
+    (np.add.reduceat, np.minimum.reduceat, ...) when rows are read.
+    """
+
+    def __init__(self, source, aggregation):
+        self.source = source
+        self.aggregation = aggregation
+        source.readers += 1
+        dtype = np.dtype(source.column.dtype)
+        if aggregation == 'mean' and dtype.kind in "biu":
+            dtype = np.dtype(np.float64)
+        self.dtype = dtype
+
+    def __len__(self):
+        return len(self.source.starts)
+
+    @property
+    def shape(self):
+        return (len(self),)
+
+    def __array__(self, dtype=None, copy=None):
+        array = self[0:len(self)]
+        if dtype is not None:
+            array = array.astype(dtype, copy=False)
+        return array
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return np.asarray(self)[key]
+        first, last, step = key.indices(len(self))
+        if step != 1:
+            return np.asarray(self)[key]
+        if last <= first:
+            return np.zeros(0, dtype=self.dtype)
+
+        values, offsets = self.source.read(first, last)
+        if self.aggregation == 'first':
+            return values[offsets]
+        if self.aggregation == 'last':
+            return values[np.append(offsets[1:], len(values)) - 1]
+
+        is_datetime = values.dtype.kind in "mM"
+        numbers = values.view(np.int64) if is_datetime else values
+        if self.aggregation == 'mean':
+            counts = np.diff(np.append(offsets, len(values)))
+            result = np.add.reduceat(numbers, offsets, dtype=np.float64) / counts
+            if is_datetime:
+                return np.round(result).astype(np.int64).view(values.dtype)
+            return result.astype(self.dtype, copy=False)
+        reduce = np.minimum if self.aggregation == 'min' else np.maximum
+        result = reduce.reduceat(numbers, offsets)
+        return result.view(values.dtype) if is_datetime else result
+
+
+def resample_columns(columns, key, interval, aggregations=("mean",), axis_columns=(), key_column=None):
+    """
+    Reduce columns to one row per fixed-interval bucket of a time axis.
+
+    Channel columns become one column per aggregation, named
+    "<column>_<aggregation>". Time columns (axis_columns) keep one value per
+    bucket: the bucket start for the column holding the key, the first
+    value in the bucket for the others. Rows are computed block by block
+    while writing.
+
+    Args:
+        columns (dict): Column name -> array, ChunkedArray or AlignedArray
+        key: Time axis of the rows to bucket on (see bucket_starts)
+        interval (float): Bucket width in seconds (samples for an index)
+        aggregations (tuple): Names from RESAMPLE_AGGREGATIONS
+        axis_columns (iterable): Names of the time columns
+        key_column (str): Name of the column holding the key, if exported
+
+    Returns:
+        dict: Column name -> ResampledArray (or bucket start times)
+
+    Raises:
+        ValueError: For an unknown aggregation or an invalid interval
+    """
+    unknown = [name for name in aggregations if name not in RESAMPLE_AGGREGATIONS]
+    if unknown or not aggregations:
+        raise ValueError(f"Unknown resampling aggregation: {', '.join(unknown) or 'none given'}")
+    starts, labels = bucket_starts(key, interval)
+
+    axis_columns = set(axis_columns)
+    resampled = {}
+    for name, column in columns.items():
+        if len(column) != len(key):
+            raise ValueError(f"Column {name} does not follow the resampling time axis")
+        if name == key_column:
+            resampled[name] = labels
+            continue
+        source = _BucketSource(column, starts, len(key))
+        if name in axis_columns:
+            resampled[name] = ResampledArray(source, 'first')
+            continue
+        for aggregation in aggregations:
+            resampled[f"{name}_{aggregation}"] = ResampledArray(source, aggregation)
+    return resampled
+
+
+def default_export_name(file_names, extension):
+    """
+    Return the default export file name for a set of TDMS files.
+
+    One file gives "<name>_export<ext>", several files
+    "<first>_to_<last>_export<ext>" (by file name).
+    """
+    if not file_names:
+        return f"tdms_export{extension}"
+    sorted_names = sorted(os.path.splitext(name)[0] for name in file_names)
+    if len(sorted_names) == 1:
+        return f"{sorted_names[0]}_export{extension}"
+    return f"{sorted_names[0]}_to_{sorted_names[-1]}_export{extension}"
+
+
+def column_length(columns):
+    """
+    Return the common length of the export columns.
+
+    Raises:
+        ValueError: If the columns differ in length
+    """
+    lengths = {len(column) for column in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("All arrays must be of the same length")
+    return lengths.pop() if lengths else 0
+
+
+def block_bounds(columns, block_rows=DEFAULT_BLOCK_ROWS):
+    """
+    Split the rows of the columns into blocks.
+
+    For resampled columns (see resample_columns) a block ends before the
+    input rows of its buckets exceed block_rows, so reading a block never
+    reads more than block_rows rows of any input column (a single bucket
+    longer than that is a block of its own).
+
+    Yields:
+        tuple: (start, stop) output rows of every block; one empty block
+        if there are no rows
+    """
+    total_rows = column_length(columns)
+    source = next((column.source for column in columns.values() if isinstance(column, ResampledArray)), None)
+    if source is None or total_rows == 0:
+        for start in range(0, max(total_rows, 1), block_rows):
+            yield start, min(start + block_rows, total_rows)
+        return
+
+    # Input row where every bucket ends
+    ends = np.append(source.starts[1:], source.length)
+    start = 0
+    while start < total_rows:
+        limit = source.starts[start] + block_rows
+        stop = max(start + 1, int(np.searchsorted(ends, limit, side='right')))
+        yield start, stop
+        start = stop
+
+
+def iter_blocks(columns, block_rows=DEFAULT_BLOCK_ROWS):
+    """
+    Walk the columns in row blocks.
+
+    Only one block of every column is materialized at a time; chunked and
+    memory-mapped columns are sliced, not copied as a whole, and resampled
+    columns read at most block_rows input rows per block (see block_bounds).
+
+    Args:
+        columns (dict): Column name -> array or ChunkedArray, in output order
+        block_rows (int): Rows per block
+
+    Yields:
+        tuple: (start, stop, block) with block mapping column names to arrays
+    """
+    for start, stop in block_bounds(columns, block_rows):
+        yield start, stop, {name: np.asarray(column[start:stop]) for name, column in columns.items()}
+
+
+def format_csv_block(block, header):
+    """
+    Format one block of rows as CSV text.
+
+    Values are formatted by pandas' CSV writer, so the text is identical to
+    writing the whole table with DataFrame.to_csv(index=False). datetime64
+    columns are written as "YYYY-MM-DD HH:MM:SS.mmm".
+
+    Args:
+        block (dict): Column name -> array of the block's rows
+        header (bool): Start with the header line
+
+    Returns:
+        str: CSV text of the block
+    """
+    frame = pd.DataFrame({
+        name: format_timestamps(values) if np.issubdtype(values.dtype, np.datetime64) else values
+        for name, values in block.items()
+    })
+    return frame.to_csv(index=False, header=header)
+
+
+def write_csv(output_file, columns, block_rows=DEFAULT_BLOCK_ROWS, progress=None, workers=1):
+    """
+    Write columns to a CSV file block by block.
+
+    Memory use is bounded by a few blocks of rows regardless of the export
+    length, and every block reaches the file as soon as it is formatted.
+    With several workers the blocks are formatted in a process pool and
+    written in order, so the file is byte-identical to the serial output.
+
+    Args:
+        output_file (str): Path of the CSV file
+        columns (dict): Column name -> array or ChunkedArray, all the same length
+        block_rows (int): Rows formatted and written at a time
+        progress (callable): Called with (rows written, total rows) after each block
+        workers (int): Number of formatting processes (1 formats in this process)
+
+    Returns:
+        int: Number of data rows written
+
+    Raises:
+        ValueError: If the columns differ in length
+    """
+    total_rows = column_length(columns)
+    # newline='' keeps pandas' line terminators as they are
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        if workers <= 1 or total_rows <= block_rows:
+            for start, stop, block in iter_blocks(columns, block_rows):
+                f.write(format_csv_block(block, header=start == 0))
+                if progress is not None:
+                    progress(stop, total_rows)
+            return total_rows
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Keep every worker busy while bounding the blocks held in memory
+            pending = deque()
+            try:
+                for start, stop, block in iter_blocks(columns, block_rows):
+                    pending.append((stop, executor.submit(format_csv_block, block, start == 0)))
+                    if len(pending) > workers:
+                        _write_next(f, pending, total_rows, progress)
+                while pending:
+                    _write_next(f, pending, total_rows, progress)
+            except BaseException:
+                # Do not format queued blocks after a failure or cancellation
+                for _, future in pending:
+                    future.cancel()
+                raise
+    return total_rows
+
+
+def write_columns(output_file, columns, export_format=None, progress=None, workers=1,
+                  compression="snappy", block_rows=DEFAULT_BLOCK_ROWS, cancel_event=None):
+    """
+    Export columns in the given format.
+
+    The data is written to "<output_file>.part" and renamed to output_file
+    only when it is complete, so a crash or cancellation never leaves a
+    truncated file behind (an existing file is replaced atomically).
+
+    Args:
+        output_file (str): Path of the output file
+        columns (dict): Column name -> array or ChunkedArray, all the same length
+        export_format (str): Key of EXPORT_FORMATS (default: from the file extension)
+        progress (callable): Called with (rows written, total rows)
+        workers (int): Formatting processes (CSV only)
+        compression (str): Parquet compression codec (one of PARQUET_COMPRESSIONS)
+        block_rows (int): Rows written at a time
+        cancel_event (threading.Event): Checked between blocks; when set the
+            export stops and the partial file is removed
+
+    Returns:
+        int: Number of data rows written
+
+    Raises:
+        ValueError: If the columns differ in length or the format is unknown
+        ImportError: If the library needed for the format is not installed
+        ExportCancelled: If cancel_event was set
+    """
+    export_format = export_format or format_from_path(output_file)
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    if not format_available(export_format):
+        library = "tables (PyTables)" if export_format == 'hdf5' else "pyarrow"
+        raise ImportError(f"{EXPORT_FORMATS[export_format][0]} export requires the '{library}' package")
+
+    def report(rows_written, total_rows):
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExportCancelled()
+        if progress is not None:
+            progress(rows_written, total_rows)
+
+    temp_file = output_file + ".part"
+    try:
+        report(0, column_length(columns))
+        if export_format == 'csv':
+            rows = write_csv(temp_file, columns, block_rows, report, workers)
+        elif export_format == 'parquet':
+            rows = write_parquet(temp_file, columns, block_rows, report, compression)
+        elif export_format == 'feather':
+            rows = write_feather(temp_file, columns, block_rows, report)
+        elif export_format == 'hdf5':
+            rows = write_hdf5(temp_file, columns, block_rows, report)
+        else:
+            rows = write_npz(temp_file, columns, block_rows, report)
+        os.replace(temp_file, output_file)
+    except BaseException:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
+    return rows
+
+
+def timespan_reference(store, channel_ids):
+    """
+    Return the time axis used to filter exports by timespan: the export
+    group's time axis (the time column without one), or the calculated
+    timestamps if there is none.
+    """
+    group = export_time_group(store, channel_ids)
+    if group is not None:
+        return store.time_axes[group][1]
+    if store.time_column is not None:
+        return store.time_column
+    return store.timestamps()
+
+
+def resample_key(store, channel_ids):
+    """
+    Return the time axis resampled exports are bucketed on: the calculated
+    timestamps (so buckets follow wall-clock time across files), else the
+    export group's time axis.
+
+    Returns:
+        tuple: (name of the export column holding it, values)
+
+    Raises:
+        ValueError: If the dataset has no time axis
+    """
+    group = export_time_group(store, channel_ids)
+    timestamps = store.aligned_timestamps(group) if group is not None else store.timestamps()
+    if timestamps is not None:
+        return "Calculated_Timestamp", timestamps
+    if group is not None:
+        return store.time_axes[group]
+    if store.time_column is not None:
+        return store.time_column_name, store.time_column
+    raise ValueError("No time axis available for resampling")
+
+
+def export_dataset(store, channel_ids, output_file, export_format=None, include_time=True,
+                   include_timestamp=False, include_group_names=True, start_value=None, end_value=None,
+                   progress=None, cancel_event=None, workers=1, compression="snappy", strict_timespan=False,
+                   resample_interval=None, aggregations=("mean",)):
+    """
+    Assemble, timespan-filter and write the export of a channel store.
+
+    Args:
+        store (ChannelStore): Loaded dataset
+        channel_ids (list): Channels to export, in column order
+        output_file (str): Output path
+        export_format (str): Key of EXPORT_FORMATS (default: from the file extension)
+        include_time (bool): Export the time/index column
+        include_timestamp (bool): Export the calculated timestamp column
+        include_group_names (bool): Prefix channel columns with their group name
+        start_value: Parsed timespan start (see tdms_data.parse_timespan) or None
+        end_value: Parsed timespan end or None
+        progress (callable): Called with (rows written, total rows)
+        cancel_event (threading.Event): Cancels the export when set
+        workers (int): CSV formatting processes
+        compression (str): Parquet compression
+        strict_timespan (bool): Raise if the timespan cannot be applied and
+            export no rows for an empty timespan. By default (GUI behavior)
+            all rows are exported in both cases and the problem is reported
+            in the summary.
+        resample_interval (float): Export one row per interval (seconds)
+            instead of every sample (see resample_columns)
+        aggregations (tuple): Per-bucket aggregations when resampling
+
+    Returns:
+        dict: 'output', 'rows', 'columns', 'timespan' ((rows kept, rows in
+        the time axis), or None without a timespan) and 'timespan_error'
+        (message if the filter could not be applied, else None)
+    """
+    columns = build_export_columns(store, channel_ids, include_time, include_timestamp, include_group_names)
+    key = resample_key(store, channel_ids) if resample_interval else None
+
+    timespan = None
+    timespan_error = None
+    if start_value is not None or end_value is not None:
+        try:
+            reference = timespan_reference(store, channel_ids)
+            if reference is None:
+                raise ValueError("No time axis available for the timespan")
+            lower, upper = timespan_bounds(reference, start_value, end_value)
+            ranges = find_ranges(reference, lower, upper)
+            kept = sum(stop - start for start, stop in ranges)
+            timespan = (kept, len(reference))
+            if kept > 0 or strict_timespan:
+                columns = apply_ranges(columns, ranges, len(reference))
+                if key is not None and len(key[1]) == len(reference):
+                    key = (key[0], select_ranges(key[1], ranges))
+        except Exception as e:
+            if strict_timespan:
+                raise
+            timespan_error = str(e)
+
+    if key is not None:
+        channel_names = {export_column_name(store.channels[channel_id], include_group_names)
+                         for channel_id in channel_ids}
+        columns = resample_columns(columns, key[1], resample_interval, aggregations,
+                                   axis_columns=[name for name in columns if name not in channel_names],
+                                   key_column=key[0])
+
+    rows = write_columns(output_file, columns, export_format, progress=progress, workers=workers,
+                         compression=compression, cancel_event=cancel_event)
+    return {
+        'output': output_file,
+        'rows': rows,
+        'columns': len(columns),
+        'timespan': timespan,
+        'timespan_error': timespan_error
+    }
+
+
+def _arrow_batch(block):
+    """Convert a block to an Arrow record batch, keeping native dtypes"""
+    return pa.RecordBatch.from_arrays([pa.array(values) for values in block.values()], names=list(block))
+
+
+def write_parquet(output_file, columns, block_rows=DEFAULT_BLOCK_ROWS, progress=None, compression="snappy"):
+    """
+    Write columns to a Parquet file, one row group per block.
+
+    Numeric columns keep their dtype and datetime64 columns are stored as
+    Parquet timestamps.
+
+    Returns:
+        int: Number of data rows written
+    """
+    total_rows = column_length(columns)
+    writer = None
+    try:
+        for start, stop, block in iter_blocks(columns, block_rows):
+            batch = _arrow_batch(block)
+            if writer is None:
+                writer = pq.ParquetWriter(output_file, batch.schema,
+                                          compression=None if compression == "none" else compression)
+            writer.write_table(pa.Table.from_batches([batch]))
+            if progress is not None:
+                progress(stop, total_rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total_rows
+
+
+def write_feather(output_file, columns, block_rows=DEFAULT_BLOCK_ROWS, progress=None):
+    """
+    Write columns to a Feather (Arrow IPC) file, one record batch per block.
+
+    Returns:
+        int: Number of data rows written
+    """
+    total_rows = column_length(columns)
+    writer = None
+    with pa.OSFile(output_file, 'wb') as sink:
+        try:
+            for start, stop, block in iter_blocks(columns, block_rows):
+                batch = _arrow_batch(block)
+                if writer is None:
+                    writer = pa.ipc.new_file(sink, batch.schema)
+                writer.write_batch(batch)
+                if progress is not None:
+                    progress(stop, total_rows)
+        finally:
+            if writer is not None:
+                writer.close()
+    return total_rows
+
+
+def write_hdf5(output_file, columns, block_rows=DEFAULT_BLOCK_ROWS, progress=None):
+    """
+    Write columns to an HDF5 file as a pandas table ("data" key).
+
+    The table is appended block by block and can be read back with
+    pandas.read_hdf(); datetime64 columns are stored as datetimes.
+
+    Returns:
+        int: Number of data rows written
+    """
+    total_rows = column_length(columns)
+    with pd.HDFStore(output_file, mode='w') as store:
+        for start, stop, block in iter_blocks(columns, block_rows):
+            frame = pd.DataFrame(block)
+            if total_rows == 0:
+                # PyTables cannot create an empty table; the fixed format
+                # still records the columns and their dtypes
+                store.put("data", frame, format='fixed')
+            else:
+                # No data columns: column names are not valid PyTables
+                # identifiers in general
+                store.append("data", frame, index=False, data_columns=None)
+            if progress is not None:
+                progress(stop, total_rows)
+    return total_rows
+
+
+def write_npz(output_file, columns, block_rows=DEFAULT_BLOCK_ROWS, progress=None):
+    """
+    Write columns to a NumPy .npz archive (one array per column).
+
+    Each member is streamed into the archive block by block, so no column
+    is copied as a whole. Needs no extra dependencies; load the result with
+    numpy.load().
+
+    Returns:
+        int: Number of data rows written
+    """
+    total_rows = column_length(columns)
+    with zipfile.ZipFile(output_file, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for column_index, (name, column) in enumerate(columns.items()):
+            dtype = column.dtype
+            if dtype.hasobject:
+                # Object columns (e.g. strings) cannot be stored raw
+                column = np.asarray(column).astype(str)
+                dtype = column.dtype
+
+            with archive.open(f"{name}.npy", 'w', force_zip64=True) as member:
+                np.lib.format.write_array_header_2_0(member, {
+                    'descr': np.lib.format.dtype_to_descr(dtype),
+                    'fortran_order': False,
+                    'shape': (total_rows,)
+                })
+                for start, stop in block_bounds(columns, block_rows):
+                    values = np.asarray(column[start:stop])
+                    member.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+            if isinstance(column, ResampledArray):
+                # The other aggregations of the column read it again anyway
+                column.source.release()
+
+            if progress is not None:
+                progress(total_rows * (column_index + 1) // len(columns), total_rows)
+    return total_rows
+
+
+def _write_next(f, pending, total_rows, progress):
+    """Write the oldest submitted block once it is formatted"""
+    stop, future = pending.popleft()
+    f.write(future.result())
+    if progress is not None:
+        progress(stop, total_rows)
@@ -0,0 +1,218 @@
+"""Persistent SQLite index of TDMS file metadata."""
+import os
+import glob
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from nptdms import TdmsFile
+from tdms_data import file_order_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    first_timestamp REAL,
+    last_timestamp REAL
+);
+CREATE TABLE IF NOT EXISTS channels (
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    group_name TEXT NOT NULL,
+    channel_name TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    dtype TEXT,
+    wf_start_time TEXT,
+    wf_start_offset REAL,
+    wf_increment REAL,
+    PRIMARY KEY (path, position)
+);
+"""
+
+
+def read_file_metadata(file_path, tdms_file=None):
+    """
+    Collect the metadata of a TDMS file for the index.
+
+    Only the first and last sample of the MachineStatus timestamp channel
+    are read; no other channel data is decoded.
+
+    Args:
+        file_path (str): Path of the TDMS file
+        tdms_file (TdmsFile): Already opened file, opened here if omitted
+
+    Returns:
+        dict: File record with 'path', 'name', 'size', 'mtime_ns',
+        'first_timestamp', 'last_timestamp' and 'channels'
+    """
+    stat = os.stat(file_path)
+    record = {
+        'path': file_path,
+        'name': os.path.basename(file_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'first_timestamp': None,
+        'last_timestamp': None,
+        'channels': []
+    }
+
+    close_file = tdms_file is None
+    if tdms_file is None:
+        tdms_file = TdmsFile.open(file_path)
+    try:
+        for group in tdms_file.groups():
+            for channel in group.channels():
+                properties = channel.properties
+                start_time = properties.get('wf_start_time')
+                record['channels'].append({
+                    'group_name': group.name,
+                    'channel_name': channel.name,
+                    'length': len(channel),
+                    'dtype': str(channel.dtype) if channel.dtype is not None else None,
+                    'wf_start_time': str(start_time) if start_time is not None else None,
+                    'wf_start_offset': _float_or_none(properties.get('wf_start_offset')),
+                    'wf_increment': _float_or_none(properties.get('wf_increment'))
+                })
+
+                if (record['first_timestamp'] is None and len(channel) > 0 and
+                        "MachineStatus" in group.name and "Timestamp" in channel.name):
+                    record['first_timestamp'] = _float_or_none(channel[0])
+                    record['last_timestamp'] = _float_or_none(channel[len(channel) - 1])
+    finally:
+        if close_file:
+            tdms_file.close()
+
+    return record
+
+
+def _float_or_none(value):
+    """Convert a property or sample value to float, or None if not numeric"""
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TdmsMetadataIndex:
+    """
+    SQLite-backed index of TDMS file metadata.
+
+    Records group/channel names, sample counts, dtypes, waveform timing
+    properties and the first/last MachineStatus timestamp of each file,
+    keyed by path and validated against the file size and modification
+    time. Indexed files can be browsed and ordered without reading them.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        connection = self._connect()
+        try:
+            connection.executescript(SCHEMA)
+        finally:
+            connection.close()
+
+    def _connect(self):
+        """Open a connection (one per call, so the index can be used from worker threads)"""
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.execute("PRAGMA foreign_keys = ON")
+        return connection
+
+    def get(self, file_path):
+        """
+        Return the indexed record of a file.
+
+        Returns:
+            dict: File record, or None if the file is not indexed or has
+            changed since it was indexed
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT name, size, mtime_ns, first_timestamp, last_timestamp FROM files WHERE path = ?",
+                (file_path,)).fetchone()
+            if row is None or row[1] != stat.st_size or row[2] != stat.st_mtime_ns:
+                return None
+
+            channels = connection.execute(
+                "SELECT group_name, channel_name, length, dtype, wf_start_time, wf_start_offset, wf_increment "
+                "FROM channels WHERE path = ? ORDER BY position", (file_path,)).fetchall()
+        finally:
+            connection.close()
+
+        keys = ('group_name', 'channel_name', 'length', 'dtype', 'wf_start_time', 'wf_start_offset', 'wf_increment')
+        return {
+            'path': file_path,
+            'name': row[0],
+            'size': row[1],
+            'mtime_ns': row[2],
+            'first_timestamp': row[3],
+            'last_timestamp': row[4],
+            'channels': [dict(zip(keys, channel)) for channel in channels]
+        }
+
+    def put(self, record):
+        """Store (or replace) the record of a file"""
+        with self._lock:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute("DELETE FROM files WHERE path = ?", (record['path'],))
+                    connection.execute(
+                        "INSERT INTO files (path, name, size, mtime_ns, first_timestamp, last_timestamp) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (record['path'], record['name'], record['size'], record['mtime_ns'],
+                         record['first_timestamp'], record['last_timestamp']))
+                    connection.executemany(
+                        "INSERT INTO channels (path, position, group_name, channel_name, length, dtype, "
+                        "wf_start_time, wf_start_offset, wf_increment) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [(record['path'], position, channel['group_name'], channel['channel_name'],
+                          channel['length'], channel['dtype'], channel['wf_start_time'],
+                          channel['wf_start_offset'], channel['wf_increment'])
+                         for position, channel in enumerate(record['channels'])])
+            finally:
+                connection.close()
+
+    def scan(self, file_path):
+        """Return the record of a file, reading its metadata only if it is not indexed yet"""
+        record = self.get(file_path)
+        if record is None:
+            record = read_file_metadata(file_path)
+            self.put(record)
+        return record
+
+    def scan_folder(self, folder, pattern="*.tdms", workers=None):
+        """
+        Index all TDMS files of a folder.
+
+        Args:
+            folder (str): Folder to scan (not recursive)
+            pattern (str): Glob pattern of the files to index
+            workers (int): Number of scanning threads (default: CPU count)
+
+        Returns:
+            list: File records ordered by first timestamp, then by name;
+            files that cannot be read are skipped
+        """
+        paths = sorted(glob.glob(os.path.join(folder, pattern)))
+        if not paths:
+            return []
+
+        def scan_or_none(path):
+            try:
+                return self.scan(path)
+            except Exception as e:
+                print(f"Warning: Could not index {path}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+            records = [record for record in executor.map(scan_or_none, paths) if record is not None]
+
+        return sorted(records, key=file_order_key)
+
@@ -1,19 +1,32 @@
 import os
-import pandas as pd
+import re
+import glob
 import json
-from datetime import datetime, timedelta
-from nptdms import TdmsFile
+from datetime import datetime
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import numpy as np
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.backends._backend_tk import NavigationToolbar2Tk
 from matplotlib.figure import Figure
 import matplotlib.dates as mdates
 from matplotlib.ticker import MaxNLocator
+import time
 import threading
 import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from tdms_data import (ChannelStore, ChannelSelection, ChannelSearchIndex, open_tdms_file, scan_tdms_file, segment_from_record,
+                       excel_serial_to_datetime, find_ranges, select_ranges, parse_timespan,
+                       timespan_bounds, tdms_handle, close_tdms_handle)
+from tdms_cache import DecodedChannelCache
+from tdms_index import TdmsMetadataIndex, read_file_metadata
+from tdms_decimate import m4_decimate, m4_indices_shared, MinMaxPyramid, is_sorted
+from tdms_export import (export_dataset, ExportCancelled, format_from_path, format_available,
+                         default_export_name, DEFAULT_WORKERS, EXPORT_FORMATS, PARQUET_COMPRESSIONS,
+                         RESAMPLE_AGGREGATIONS)
+
+# Default memory budget for decoded channel data
+DEFAULT_MEMORY_BUDGET_MB = 4096
 
 class TDMSViewer(tk.Tk):
     def __init__(self):
@@ -24,17 +37,65 @@ class TDMSViewer(tk.Tk):
         
         # Initialize variables
         self.tdms_files = []  # List to store multiple TDMS files
-        self.channels_data = {}
+        # Decoded channels are cached on disk as memory-mapped .npy files
+        self.disk_cache = DecodedChannelCache(os.path.join(os.getcwd(), "cache"))
+        # Decoded channels beyond the memory budget are dropped least recently
+        # used first (selected channels are pinned) and read again on demand
+        self.channel_store = ChannelStore(cache=self.disk_cache, memory_budget=DEFAULT_MEMORY_BUDGET_MB * 2**20)
+        
+        # File metadata is indexed in SQLite so known files open without reading them
+        try:
+            self.metadata_index = TdmsMetadataIndex(os.path.join(os.getcwd(), "tdms_index.sqlite"))
+        except Exception as e:
+            print(f"Warning: Could not open metadata index: {e}")
+            self.metadata_index = None
+        self.channels_data = self.channel_store.channels
         self.all_channels = []  # Store all channel display names for filtering
-        self.time_column = None
-        self.time_column_name = None
+        self.channel_search = ChannelSearchIndex([])
+        self.visible_channels = []  # Channels shown in the available list
+        # Selected channels; the selected listbox only mirrors this model
+        self.selection = ChannelSelection()
         self.settings_file = os.path.join(os.getcwd(), "last_selection.json")
         
+        # Lazy loading: open files with TdmsFile.open (metadata only) and
+        # decode channel data on demand when previewed or exported
+        self.lazy_loading = True
+        
+        # Background file loading: worker threads report through this queue
+        self.load_queue = queue.Queue()
+        self.load_job = None
+        
+        # Background export: the export thread reports through this queue
+        self.export_queue = queue.Queue()
+        self.export_job = None
+        
         # Preview pane variables
         self.preview_enabled = True
         self.max_preview_points = 10000
         self._update_timer = None
+        # Preview worker: requests go to preview_requests, finished plot
+        # data comes back through preview_queue; only results of the latest
+        # generation are drawn
+        self.preview_requests = queue.Queue()
         self.preview_queue = queue.Queue()
+        self.preview_worker = None
+        self.preview_generation = 0
+        self.preview_drawn_generation = 0
+        self._preview_poll = None
+        # Min/max pyramids of previewed channels for zoom-aware decimation,
+        # keyed by channel id: (view key, pyramid, x is sorted). The preview
+        # worker only reads these caches; its new entries come back with
+        # the result and are stored on the main thread
+        self.preview_pyramids = {}
+        self.preview_view = None
+        # Persistent preview lines (one per stacked axis) and the axis
+        # labels they were laid out for
+        self.preview_axes = []
+        self.preview_lines = []
+        self.preview_line = None
+        self.preview_layout_key = None
+        # Memoized timespan index ranges keyed by ((group, axis label), length, start, end)
+        self.timespan_ranges = {}
         
         # Timespan control variables
         self.timespan_enabled = False
@@ -43,6 +104,36 @@ class TDMSViewer(tk.Tk):
         self.timespan_use_for_export = False
         
         self.create_widgets()
+        
+        # Make sure open TDMS file handles are released on exit
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+    
+    @property
+    def time_column(self):
+        """Time (or index) column of the combined dataset"""
+        return self.channel_store.time_column
+    
+    @property
+    def time_column_name(self):
+        """Name of the time column ("Time" or "Index")"""
+        return self.channel_store.time_column_name
+    
+    def on_close(self):
+        """Close all open TDMS files and destroy the window"""
+        if self.load_job is not None:
+            self.load_job['cancel'].set()
+        if self.export_job is not None:
+            # The export removes its partial file when it stops
+            self.export_job['cancel'].set()
+            self.export_job['thread'].join(timeout=5)
+        self.preview_requests.put(None)
+        # Waits for a decode of the preview worker, which then cannot
+        # reopen the files closed below
+        self.channel_store.clear()
+        for file_info in self.tdms_files:
+            self.close_tdms_file(file_info)
+        self.tdms_files.clear()
+        self.destroy()
     
     def create_widgets(self):
         # Main frame
@@ -65,8 +156,29 @@ class TDMSViewer(tk.Tk):
         button_subframe = ttk.Frame(file_frame)
         button_subframe.grid(row=0, column=0, columnspan=3, sticky="ew", pady=(0, 5))
         
-        ttk.Button(button_subframe, text="Add TDMS Files...", command=self.add_files).pack(side=tk.LEFT, padx=(0, 5))
+        self.add_files_button = ttk.Button(button_subframe, text="Add TDMS Files...", command=self.add_files)
+        self.add_files_button.pack(side=tk.LEFT, padx=(0, 5))
+        self.add_folder_button = ttk.Button(button_subframe, text="Add Folder...", command=self.add_folder)
+        self.add_folder_button.pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(button_subframe, text="Clear All", command=self.clear_files).pack(side=tk.LEFT, padx=(0, 5))
+        self.cancel_load_button = ttk.Button(button_subframe, text="Cancel", command=self.cancel_file_loading,
+                                             state=tk.DISABLED)
+        self.cancel_load_button.pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_subframe, text="Clear Cache", command=self.clear_disk_cache).pack(side=tk.LEFT, padx=(0, 5))
+        
+        # Lazy loading option (applies to files added afterwards)
+        self.lazy_loading_var = tk.BooleanVar(value=self.lazy_loading)
+        ttk.Checkbutton(button_subframe, text="Lazy loading (read channel data on demand)",
+                       variable=self.lazy_loading_var).pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Memory budget of decoded channel data
+        ttk.Label(button_subframe, text="Memory budget (MB):").pack(side=tk.LEFT, padx=(10, 0))
+        self.memory_budget_var = tk.StringVar(value=str(DEFAULT_MEMORY_BUDGET_MB))
+        budget_spinbox = ttk.Spinbox(button_subframe, from_=256, to=1 << 20, increment=256, width=7,
+                                     textvariable=self.memory_budget_var, command=self.on_memory_budget_changed)
+        budget_spinbox.pack(side=tk.LEFT, padx=(5, 0))
+        budget_spinbox.bind('<Return>', self.on_memory_budget_changed)
+        budget_spinbox.bind('<FocusOut>', self.on_memory_budget_changed)
         
         # Files list with scrollbar
         files_list_frame = ttk.Frame(file_frame)
@@ -106,6 +218,7 @@ class TDMSViewer(tk.Tk):
         search_frame.grid(row=1, column=0, sticky="ew", padx=(0, 5), pady=(0, 5))
         search_frame.columnconfigure(1, weight=1)
         
+        # Filter: words (all must match), glob (*, ?, [) or "re:" regular expression
         ttk.Label(search_frame, text="Filter:").grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
         self.filter_var = tk.StringVar()
         self.filter_entry = ttk.Entry(search_frame, textvariable=self.filter_var)
@@ -121,11 +234,15 @@ class TDMSViewer(tk.Tk):
         available_frame.columnconfigure(0, weight=1)
         available_frame.rowconfigure(0, weight=1)
         
-        self.available_listbox = tk.Listbox(available_frame, selectmode=tk.EXTENDED, height=6)
+        # The listbox shows a list variable that is replaced in one call per
+        # filter change; Tk only renders the rows that are visible
+        self.available_items_var = tk.Variable(value=())
+        self.available_listbox = tk.Listbox(available_frame, selectmode=tk.EXTENDED, height=6,
+                                            listvariable=self.available_items_var)
         self.available_listbox.grid(row=0, column=0, sticky="nsew")
         
         # Add placeholder text so frame is visible even without TDMS files
-        self.available_listbox.insert(tk.END, "No TDMS files loaded - Add files to see channels")
+        self.available_items_var.set(("No TDMS files loaded - Add files to see channels",))
         
         available_scrollbar = ttk.Scrollbar(available_frame, orient="vertical", command=self.available_listbox.yview)
         available_scrollbar.grid(row=0, column=1, sticky="ns")
@@ -185,15 +302,67 @@ class TDMSViewer(tk.Tk):
         ttk.Checkbutton(export_frame, text="Include group names in column headers (e.g., 'Group_ChannelName' vs 'ChannelName')", 
                        variable=self.include_group_names_var).grid(row=2, column=0, sticky=tk.W, pady=2)
         
+        # Output format, Parquet compression and number of processes
+        # formatting CSV blocks in parallel
+        format_frame = ttk.Frame(export_frame)
+        format_frame.grid(row=3, column=0, sticky=tk.W, pady=2)
+        ttk.Label(format_frame, text="Format:").pack(side=tk.LEFT)
+        self.export_format_var = tk.StringVar(value=EXPORT_FORMATS['csv'][0])
+        ttk.Combobox(format_frame, textvariable=self.export_format_var, state="readonly", width=16,
+                     values=[description for description, _ in EXPORT_FORMATS.values()]).pack(side=tk.LEFT, padx=(5, 15))
+        ttk.Label(format_frame, text="Parquet compression:").pack(side=tk.LEFT)
+        self.parquet_compression_var = tk.StringVar(value=PARQUET_COMPRESSIONS[0])
+        ttk.Combobox(format_frame, textvariable=self.parquet_compression_var, state="readonly", width=8,
+                     values=PARQUET_COMPRESSIONS).pack(side=tk.LEFT, padx=(5, 15))
+        ttk.Label(format_frame, text="Export worker processes:").pack(side=tk.LEFT)
+        self.export_workers_var = tk.StringVar(value=str(DEFAULT_WORKERS))
+        ttk.Spinbox(format_frame, from_=1, to=max(DEFAULT_WORKERS, 64), width=5,
+                    textvariable=self.export_workers_var).pack(side=tk.LEFT, padx=(5, 0))
+        
+        # Resampling: one row per interval with per-interval aggregations
+        resample_frame = ttk.Frame(export_frame)
+        resample_frame.grid(row=4, column=0, sticky=tk.W, pady=2)
+        self.resample_enabled_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(resample_frame, text="Resample to interval (s):",
+                        variable=self.resample_enabled_var).pack(side=tk.LEFT)
+        self.resample_interval_var = tk.StringVar(value="1.0")
+        ttk.Entry(resample_frame, textvariable=self.resample_interval_var, width=8).pack(side=tk.LEFT, padx=(5, 15))
+        ttk.Label(resample_frame, text="Aggregations:").pack(side=tk.LEFT)
+        self.resample_aggregation_vars = {}
+        for aggregation in RESAMPLE_AGGREGATIONS:
+            self.resample_aggregation_vars[aggregation] = tk.BooleanVar(value=aggregation == "mean")
+            ttk.Checkbutton(resample_frame, text=aggregation,
+                            variable=self.resample_aggregation_vars[aggregation]).pack(side=tk.LEFT, padx=(5, 0))
+        
         # Export button
-        self.export_button = ttk.Button(export_frame, text="Export Selected Channels to CSV", 
+        self.export_button = ttk.Button(export_frame, text="Export Selected Channels", 
                                       command=self.export_to_csv, state=tk.DISABLED)
-        self.export_button.grid(row=3, column=0, pady=5)
+        self.export_button.grid(row=5, column=0, pady=5)
+        
+        # Export progress (rows written) and cancellation
+        progress_frame = ttk.Frame(export_frame)
+        progress_frame.grid(row=6, column=0, sticky="ew", pady=(0, 2))
+        progress_frame.columnconfigure(0, weight=1)
+        self.export_progress_var = tk.DoubleVar(value=0.0)
+        ttk.Progressbar(progress_frame, variable=self.export_progress_var,
+                        maximum=100.0).grid(row=0, column=0, sticky="ew", padx=(0, 5))
+        self.cancel_export_button = ttk.Button(progress_frame, text="Cancel Export", command=self.cancel_export,
+                                               state=tk.DISABLED)
+        self.cancel_export_button.grid(row=0, column=1)
         
         # Status bar
         self.status_var = tk.StringVar(value="Ready - Please select a TDMS file")
-        status_bar = ttk.Label(main_frame, textvariable=self.status_var, relief=tk.SUNKEN)
-        status_bar.grid(row=4, column=0, sticky="ew", pady=(10, 0))
+        status_frame = ttk.Frame(main_frame)
+        status_frame.grid(row=4, column=0, sticky="ew", pady=(10, 0))
+        status_frame.columnconfigure(0, weight=1)
+        status_bar = ttk.Label(status_frame, textvariable=self.status_var, relief=tk.SUNKEN)
+        status_bar.grid(row=0, column=0, sticky="ew")
+        
+        # Decoded channel data vs. memory budget, refreshed every second
+        self.memory_status_var = tk.StringVar(value="")
+        ttk.Label(status_frame, textvariable=self.memory_status_var, relief=tk.SUNKEN).grid(row=0, column=1,
+                                                                                            sticky="e", padx=(5, 0))
+        self.after(1000, self.update_memory_status)
 
     def create_preview_pane(self, parent):
         """Create the signal preview pane with matplotlib integration"""
@@ -243,6 +412,19 @@ class TDMSViewer(tk.Tk):
                                            command=self.update_preview)
         timestamp_checkbox.grid(row=0, column=5, sticky=tk.W, padx=(10, 0))
         
+        # Stacked preview of the first N selected channels
+        stack_frame = ttk.Frame(controls_frame)
+        stack_frame.grid(row=0, column=6, sticky=tk.W, padx=(10, 0))
+        self.preview_stacked_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(stack_frame, text="Stack selected", variable=self.preview_stacked_var,
+                        command=self.update_preview).pack(side=tk.LEFT)
+        ttk.Label(stack_frame, text="Max:").pack(side=tk.LEFT, padx=(5, 2))
+        self.preview_stack_limit_var = tk.StringVar(value="8")
+        stack_spinbox = ttk.Spinbox(stack_frame, from_=1, to=64, width=3, textvariable=self.preview_stack_limit_var,
+                                    command=self.on_stack_limit_changed)
+        stack_spinbox.pack(side=tk.LEFT)
+        stack_spinbox.bind('<Return>', self.on_stack_limit_changed)
+        
         # Second row for timespan controls
         controls_frame.rowconfigure(1, weight=0)
         
@@ -292,9 +474,8 @@ class TDMSViewer(tk.Tk):
         
         # Create matplotlib figure and canvas - compact size
         self.preview_figure = Figure(figsize=(8, 3), dpi=80, facecolor='white')
-        self.preview_axis = self.preview_figure.add_subplot(111)
+        self.reset_preview_axes(1, datetime_axis=False)
         self.preview_axis.set_title("Select a channel to preview")
-        self.preview_axis.grid(True, alpha=0.3)
         
         # Create canvas and toolbar
         canvas_frame = ttk.Frame(preview_frame)
@@ -357,15 +538,24 @@ class TDMSViewer(tk.Tk):
             # Reset to current value if invalid
             self.sample_size_var.set(str(self.max_preview_points))
     
+    def on_stack_limit_changed(self, event=None):
+        """Handle a change of the number of stacked channels"""
+        if self.preview_enabled_var.get() and self.preview_stacked_var.get():
+            self.update_preview()
+    
+    def get_stack_limit(self):
+        """Return the maximum number of stacked preview channels (at least 1)"""
+        try:
+            return max(1, int(self.preview_stack_limit_var.get()))
+        except ValueError:
+            self.preview_stack_limit_var.set("8")
+            return 8
+    
     def update_preview_channel_options(self):
         """Update the channel dropdown with currently selected channels"""
-        selected_channels = []
-        for i in range(self.selected_listbox.size()):
-            selected_channels.append(self.selected_listbox.get(i))
-        
         # Add special options
         options = ["First Selected", "Last Selected"]
-        options.extend(selected_channels)
+        options.extend(self.selection)
         
         self.preview_channel_combo['values'] = options
         
@@ -380,187 +570,620 @@ class TDMSViewer(tk.Tk):
         self.update_preview()
     
     def update_preview(self):
-        """Update the preview plot with selected channel data"""
+        """
+        Request a preview of the selected channels.
+        
+        The Tk variables are read here; channel lookup, timestamps, timespan
+        filtering and decimation run on the preview worker thread and the
+        finished arrays are drawn by process_preview_queue. Every request
+        gets a new generation number, and requests or results superseded by
+        a newer one are dropped.
+        """
         if not self.preview_enabled_var.get() or not self.channels_data:
             return
         
-        try:
-            # Get selected channel for preview
+        request = self.get_preview_request()
+        self.preview_generation += 1
+        request['generation'] = self.preview_generation
+        
+        if self.preview_worker is None or not self.preview_worker.is_alive():
+            self.preview_worker = threading.Thread(target=self.preview_worker_loop, daemon=True)
+            self.preview_worker.start()
+        self.preview_requests.put(request)
+        
+        if self._preview_poll is None:
+            self._preview_poll = self.after(100, self.process_preview_queue)
+    
+    def get_preview_request(self):
+        """Collect the preview settings from the widgets (main thread)"""
+        if self.preview_stacked_var.get():
+            names = self.selection.names()[:self.get_stack_limit()]
+        else:
             channel_to_preview = self.get_preview_channel()
-            if not channel_to_preview:
-                self.clear_preview("No channels selected")
-                return
-            
-            # Find channel data
-            channel_data = None
-            for channel_id, channel_info in self.channels_data.items():
-                if channel_info['display_name'] == channel_to_preview:
-                    channel_data = channel_info['data']
+            names = [channel_to_preview] if channel_to_preview else []
+        
+        timespan = None
+        if self.timespan_enabled_var.get():
+            start_str = self.timespan_start_var.get().strip()
+            end_str = self.timespan_end_var.get().strip()
+            start_value = self.parse_timespan_input(start_str) if start_str else None
+            end_value = self.parse_timespan_input(end_str) if end_str else None
+            timespan = (start_str, end_str, start_value, end_value)
+        
+        return {
+            'stacked': self.preview_stacked_var.get(),
+            'names': names,
+            'use_timestamp': self.preview_use_timestamp_var.get(),
+            'timespan': timespan
+        }
+    
+    def preview_worker_loop(self):
+        """
+        Compute preview requests (background thread).
+        
+        Only the newest waiting request is computed; results are posted to
+        self.preview_queue. Must not touch any Tk widgets.
+        """
+        while True:
+            request = self.preview_requests.get()
+            while True:
+                try:
+                    request = self.preview_requests.get_nowait()
+                except queue.Empty:
                     break
-            
-            if channel_data is None:
-                self.clear_preview("Channel data not found")
+            if request is None:
                 return
+            if request['generation'] != self.preview_generation:
+                continue
             
-            # Prepare time/index data
-            if self.preview_use_timestamp_var.get():
-                # Use calculated timestamp if requested and available
-                timestamp_data = self.create_timestamp_column()
-                if timestamp_data and len(timestamp_data) == len(channel_data):
-                    try:
-                        # Convert timestamp strings to datetime objects for plotting
-                        x_data = []
-                        for ts_str in timestamp_data:
-                            if ts_str and not ts_str.startswith("Invalid"):
-                                try:
-                                    dt = datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S.%f")
-                                    x_data.append(dt)
-                                except ValueError:
-                                    # Try without microseconds
-                                    dt = datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S")
-                                    x_data.append(dt)
-                            else:
-                                x_data.append(None)
-                        
-                        # Remove None values and corresponding channel data
-                        valid_indices = [i for i, x in enumerate(x_data) if x is not None]
-                        if valid_indices:
-                            x_data = [x_data[i] for i in valid_indices]
-                            channel_data = [channel_data[i] for i in valid_indices]
-                            x_label = "Calculated Timestamp"
-                        else:
-                            raise ValueError("No valid timestamps found")
-                            
-                    except Exception as e:
-                        # Fallback if timestamp conversion fails
-                        if self.time_column and len(self.time_column) == len(channel_data):
-                            x_data = self.time_column
-                            x_label = self.time_column_name or "Time"
-                        else:
-                            x_data = list(range(len(channel_data)))
-                            x_label = "Index (Timestamp conversion failed)"
+            # Pyramids and timespan ranges computed for this request
+            request['cache_updates'] = []
+            try:
+                if request['stacked']:
+                    result = self.prepare_stacked_preview(request)
                 else:
-                    # Fallback to regular time or index
-                    if self.time_column and len(self.time_column) == len(channel_data):
-                        x_data = self.time_column
-                        x_label = self.time_column_name or "Time"
-                    else:
-                        x_data = list(range(len(channel_data)))
-                        x_label = "Index (Timestamp not available)"
-            elif self.time_column and len(self.time_column) == len(channel_data):
-                x_data = self.time_column
-                x_label = self.time_column_name or "Time"
+                    result = self.prepare_preview(request)
+            except Exception as e:
+                result = {'message': f"Preview error: {str(e)}"}
+            result['generation'] = request['generation']
+            result['cache_updates'] = request['cache_updates']
+            self.preview_queue.put(result)
+    
+    def process_preview_queue(self):
+        """Draw the newest finished preview posted by the worker (main thread)"""
+        self._preview_poll = None
+        result = None
+        while True:
+            try:
+                message = self.preview_queue.get_nowait()
+            except queue.Empty:
+                break
+            if message['generation'] == self.preview_generation:
+                result = message
+        
+        if result is not None:
+            # Only the current result's cache entries are kept; superseded
+            # ones may have been computed from files removed since
+            for cache, key, value in result['cache_updates']:
+                cache[key] = value
+            self.preview_drawn_generation = result['generation']
+            self.draw_preview(result)
+        
+        # Keep polling while a request is still being computed
+        if self.preview_drawn_generation < self.preview_generation:
+            self._preview_poll = self.after(100, self.process_preview_queue)
+    
+    def draw_preview(self, result):
+        """Put the arrays of a finished preview on the persistent lines (main thread)"""
+        if 'message' in result:
+            self.clear_preview(result['message'])
+            return
+        
+        # Autoscaling fires xlim_changed, which must not re-decimate the
+        # previous channel onto the new lines
+        self.preview_view = None
+
+        # The axes are only rebuilt and laid out again when the x axis kind
+        # or labels change
+        self.set_preview_labels(result['x_label'], result['y_labels'], result['datetime_axis'])
+        self.preview_axis.set_title(result['title'])
+        for line, x_values, y_values in zip(self.preview_lines, result['x_plot'], result['y_plot']):
+            line.set_data(x_values, y_values)
+        self.refresh_preview_limits()
+        
+        # Re-decimate whenever the toolbar pans or zooms
+        view = result['view']
+        if view is not None:
+            if 'ys' in view:
+                view['lines'] = list(self.preview_lines)
             else:
-                x_data = list(range(len(channel_data)))
-                x_label = "Index"
+                view['line'] = self.preview_line
+        self.preview_view = view
+        self.preview_status_var.set(result['status'])
+    
+    def prepare_preview(self, request):
+        """
+        Compute the plot data of one channel (preview worker).
+        
+        Returns:
+            dict: Arrays, labels and status for draw_preview, or
+            {'message': ...} to clear the preview with a message
+        """
+        if not request['names']:
+            return {'message': "No channels selected"}
+        channel_to_preview = request['names'][0]
+        
+        # Find channel data
+        preview_channel_id = self.channel_store.channel_id(channel_to_preview)
+        channel_data = self.get_channel_data(preview_channel_id) if preview_channel_id is not None else None
+        if channel_data is None:
+            return {'message': "Channel data not found"}
+        
+        # Prepare time/index data
+        x_data, x_label, valid_mask = self.get_preview_x_data(preview_channel_id, len(channel_data),
+                                                              request['use_timestamp'])
+        if valid_mask is not None:
+            channel_data = channel_data[valid_mask]
+        
+        # Apply timespan filtering if enabled
+        timespan_info = ""
+        view_key = (x_label, None)
+        if request['timespan'] is not None:
+            original_count = len(x_data)
+            start_str, end_str, start_value, end_value = request['timespan']
+            view_key = (x_label, (start_str, end_str))
             
-            # Apply timespan filtering if enabled
-            timespan_info = ""
-            if self.timespan_enabled_var.get():
-                original_count = len(x_data)
-                start_str = self.timespan_start_var.get().strip()
-                end_str = self.timespan_end_var.get().strip()
+            try:
+                group_name = self.channels_data[preview_channel_id]['group_name']
+                ranges = self.find_timespan_ranges(x_data, start_value, end_value, axis_key=(group_name, x_label),
+                                                   cache_updates=request['cache_updates'])
+                if ranges is not None and len(x_data) == len(channel_data):
+                    x_data, channel_data = select_ranges(x_data, ranges), select_ranges(channel_data, ranges)
+                filtered_count = len(x_data)
                 
+                if filtered_count != original_count:
+                    timespan_info = f" (filtered {original_count} to {filtered_count} points)"
+                elif filtered_count == 0:
+                    return {'message': f"No data in timespan range: {start_str} to {end_str}"}
+            except Exception as e:
+                # If filtering fails, show error but continue with unfiltered data
+                timespan_info = f" (filter error: {str(e)[:30]}...)"
+        
+        # Apply data sampling if needed; large signals get a min/max
+        # pyramid so zooming can re-decimate the visible range
+        view = None
+        full_x, full_y = x_data, channel_data
+        if len(channel_data) > self.max_preview_points:
+            pyramid, x_sorted = self.get_preview_pyramid(preview_channel_id, view_key, x_data, channel_data,
+                                                         request['cache_updates'])
+            x_data, channel_data = self.sample_data(x_data, channel_data, pyramid)
+            sample_info = f" (sampled to {len(channel_data)} points)"
+            if x_sorted:
+                view = {
+                    'x': full_x,
+                    'y': full_y,
+                    'pyramid': pyramid,
+                    'range': (0, len(full_y)),
+                    'info': timespan_info
+                }
+        else:
+            sample_info = ""
+        
+        return {
+            'x_label': x_label,
+            'y_labels': ["Value"],
+            'datetime_axis': np.issubdtype(x_data.dtype, np.datetime64),
+            'title': f"{channel_to_preview}{timespan_info}{sample_info}",
+            'x_plot': [np.asarray(x_data)],
+            'y_plot': [np.asarray(channel_data)],
+            'view': view,
+            'status': f"Showing {len(channel_data)} points{timespan_info}{sample_info}"
+        }
+    
+    def prepare_stacked_preview(self, request):
+        """
+        Compute the plot data of the first N selected channels as stacked
+        subplots with a shared x axis (preview worker).
+        
+        The time axis is filtered once. Channels with a sorted x axis get a
+        min/max pyramid each (as in the single channel preview), so zooming
+        re-decimates only the visible range; otherwise all channels are
+        decimated with one bucket layout in one vectorized pass
+        (m4_indices_shared). Channels must share the first one's group (and so its time axis)
+        and sample count; others are left out and counted in the status
+        line.
+        
+        Returns:
+            dict: Arrays, labels and status for draw_preview, or
+            {'message': ...} to clear the preview with a message
+        """
+        if not request['names']:
+            return {'message': "No channels selected"}
+        
+        # Find channel data
+        labels, ys, channel_ids = [], [], []
+        first_channel_id = None
+        first_group = None
+        skipped = 0
+        for name in request['names']:
+            channel_id = self.channel_store.channel_id(name)
+            data = self.get_channel_data(channel_id) if channel_id is not None else None
+            if data is None:
+                skipped += 1
+                continue
+            # Groups have their own time axes, even with equal sample counts
+            group_name = self.channels_data[channel_id]['group_name']
+            if ys and (len(data) != len(ys[0]) or group_name != first_group):
+                skipped += 1
+                continue
+            if first_channel_id is None:
+                first_channel_id = channel_id
+                first_group = group_name
+            labels.append(self.channels_data[channel_id]['channel_name'])
+            ys.append(data)
+            channel_ids.append(channel_id)
+        if not ys:
+            return {'message': "Channel data not found"}
+        
+        # Shared time/index axis, filtered once
+        x_data, x_label, valid_mask = self.get_preview_x_data(first_channel_id, len(ys[0]), request['use_timestamp'])
+        if valid_mask is not None:
+            ys = [y[valid_mask] for y in ys]
+        
+        timespan_info = ""
+        view_key = (x_label, None)
+        if request['timespan'] is not None:
+            original_count = len(x_data)
+            start_str, end_str, start_value, end_value = request['timespan']
+            view_key = (x_label, (start_str, end_str))
+            try:
+                ranges = self.find_timespan_ranges(x_data, start_value, end_value, axis_key=(first_group, x_label),
+                                                   cache_updates=request['cache_updates'])
+                if ranges is not None:
+                    x_data = select_ranges(x_data, ranges)
+                    ys = [select_ranges(y, ranges) for y in ys]
+                filtered_count = len(x_data)
+                if filtered_count == 0:
+                    return {'message': f"No data in timespan range: {start_str} to {end_str}"}
+                if filtered_count != original_count:
+                    timespan_info = f" (filtered {original_count} to {filtered_count} points)"
+            except Exception as e:
+                timespan_info = f" (filter error: {str(e)[:30]}...)"
+        
+        # Large channels on a sorted axis get a min/max pyramid each, so
+        # zooming does not go back to the raw samples on the Tk thread
+        pyramids = None
+        if len(x_data) > self.max_preview_points and is_sorted(x_data):
+            pyramids = [self.get_preview_pyramid(channel_id, view_key, x_data, y, request['cache_updates'],
+                                                 x_sorted=True)[0]
+                        for channel_id, y in zip(channel_ids, ys)]
+        x_plot, y_plot = self.sample_stacked_data(x_data, ys, pyramids=pyramids)
+        shown = max(y.size for y in y_plot)
+        sample_info = f" (sampled to {shown} points)" if len(x_data) > self.max_preview_points else ""
+        skipped_info = f" ({skipped} channels of other groups or sample counts not shown)" if skipped else ""
+        
+        view = None
+        if pyramids is not None:
+            view = {
+                'x': x_data,
+                'ys': ys,
+                'pyramids': pyramids,
+                'range': (0, len(x_data)),
+                'info': timespan_info
+            }
+        
+        return {
+            'x_label': x_label,
+            'y_labels': labels,
+            'datetime_axis': np.issubdtype(x_data.dtype, np.datetime64),
+            'title': f"{len(ys)} channels{timespan_info}{sample_info}",
+            'x_plot': x_plot,
+            'y_plot': y_plot,
+            'view': view,
+            'status': (f"Showing {len(ys)} channels, {shown} points each"
+                       f"{timespan_info}{sample_info}{skipped_info}")
+        }
+    
+    def get_preview_x_data(self, channel_id, length, use_timestamp=False):
+        """
+        Return the x values for previewing a channel (and others with the same
+        sample count) on the time axis of the channel's group.
+        
+        Args:
+            channel_id (str): Channel identifier
+            length (int): Sample count of the channel
+            use_timestamp (bool): Use the calculated timestamps if available
+        
+        Returns:
+            tuple: (x values, axis label, mask of valid samples to apply to
+            the channel data or None)
+        """
+        time_axis = self.channel_store.time_axis(channel_id)
+        has_time_column = time_axis is not None
+        if has_time_column:
+            time_column_name, time_column = time_axis
+        if use_timestamp:
+            # Use calculated timestamp if requested and available
+            timestamp_data = self.create_timestamp_column()
+            if timestamp_data is not None and len(timestamp_data) != length and has_time_column:
+                # Timestamps of another group (rate) are interpolated onto
+                # this channel's time axis
+                group_name = self.channels_data[channel_id]['group_name']
+                timestamp_data = np.asarray(self.channel_store.aligned_timestamps(group_name))
+            if timestamp_data is not None and len(timestamp_data) == length:
                 try:
-                    x_data, channel_data = self.filter_data_by_timespan(x_data, channel_data)
-                    filtered_count = len(x_data)
-                    
-                    if filtered_count != original_count:
-                        timespan_info = f" (filtered {original_count} to {filtered_count} points)"
-                    elif filtered_count == 0:
-                        self.clear_preview(f"No data in timespan range: {start_str} to {end_str}")
-                        return
-                except Exception as e:
-                    # If filtering fails, show error but continue with unfiltered data
-                    timespan_info = f" (filter error: {str(e)[:30]}...)"
-            
-            # Apply data sampling if needed
-            if len(channel_data) > self.max_preview_points:
-                x_data, channel_data = self.sample_data(x_data, channel_data)
-                sample_info = f" (sampled to {len(channel_data)} points)"
-            else:
-                sample_info = ""
-            
-            # Clear and plot
-            self.preview_axis.clear()
-            self.preview_axis.plot(x_data, channel_data, 'b-', linewidth=1, alpha=0.8)
-            
-            # Format plot
-            self.preview_axis.set_title(f"{channel_to_preview}{timespan_info}{sample_info}")
-            self.preview_axis.set_xlabel(x_label)
-            self.preview_axis.set_ylabel("Value")
-            self.preview_axis.grid(True, alpha=0.3)
-            
-            # Format x-axis for timestamps
-            if x_label == "Calculated Timestamp" and len(x_data) > 0:
-                self.preview_axis.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
-                self.preview_axis.xaxis.set_major_locator(MaxNLocator(6))
-                # Rotate labels for better readability  
-                for label in self.preview_axis.xaxis.get_majorticklabels():
-                    label.set_rotation(45)
-                    label.set_horizontalalignment('right')
-            
-            # Auto-scale and refresh
-            self.preview_axis.relim()
-            self.preview_axis.autoscale()
-            self.preview_figure.tight_layout()
-            self.preview_canvas.draw()
-            
-            self.preview_status_var.set(f"Showing {len(channel_data)} points{timespan_info}{sample_info}")
-            
-        except Exception as e:
-            self.clear_preview(f"Preview error: {str(e)}")
+                    # Remove invalid values and corresponding channel data
+                    if any(np.isnat(chunk).any() for chunk in getattr(timestamp_data, 'chunks', [timestamp_data])):
+                        valid_mask = ~np.isnat(np.asarray(timestamp_data))
+                        if not valid_mask.any():
+                            raise ValueError("No valid timestamps found")
+                        return timestamp_data[valid_mask], "Calculated Timestamp", valid_mask
+                    # Cached datetime64 timestamps are plotted directly
+                    return timestamp_data, "Calculated Timestamp", None
+                except Exception:
+                    # Fallback if timestamp conversion fails
+                    if has_time_column:
+                        return time_column, time_column_name, None
+                    return np.arange(length), "Index (Timestamp conversion failed)", None
+            # Fallback to regular time or index
+            if has_time_column:
+                return time_column, time_column_name, None
+            return np.arange(length), "Index (Timestamp not available)", None
+        
+        if has_time_column:
+            return time_column, time_column_name, None
+        return np.arange(length), "Index", None
     
     def get_preview_channel(self):
         """Get the channel name to preview based on current selection"""
-        selected_count = self.selected_listbox.size()
-        if selected_count == 0:
+        if not self.selection:
             return None
         
         choice = self.preview_channel_var.get()
         
         if choice == "First Selected":
-            return self.selected_listbox.get(0)
+            return self.selection.first()
         elif choice == "Last Selected":
-            return self.selected_listbox.get(selected_count - 1)
+            return self.selection.last()
         else:
             # Specific channel selected
             return choice
     
-    def sample_data(self, x_data, y_data):
-        """Apply intelligent sampling to reduce data points while preserving characteristics"""
+    def sample_data(self, x_data, y_data, pyramid=None, start=0, stop=None):
+        """
+        Reduce data points with min/max decimation so every extreme stays visible.
+        
+        Args:
+            x_data: X values
+            y_data: Channel values
+            pyramid (MinMaxPyramid): Precomputed pyramid of y_data; if given,
+                only the range [start, stop) is decimated from it
+            start (int): First sample of the range (pyramid only)
+            stop (int): End of the range (pyramid only, default: all samples)
+        
+        Returns:
+            tuple: (x, y) arrays with at most about max_preview_points points
+        """
+        n_buckets = max(1, self.max_preview_points // 4)
+        if pyramid is not None:
+            indices = pyramid.indices(start, len(y_data) if stop is None else stop, n_buckets)
+            return x_data[indices], y_data[indices]
+        
         if len(y_data) <= self.max_preview_points:
             return x_data, y_data
         
-        # Calculate sampling step
-        step = len(y_data) / self.max_preview_points
-        
-        # Use numpy for efficient sampling
-        indices = np.linspace(0, len(y_data) - 1, self.max_preview_points, dtype=int)
-        
-        sampled_x = [x_data[i] for i in indices]
-        sampled_y = [y_data[i] for i in indices]
+        # First/min/max/last of each bucket: at most max_preview_points points
+        return m4_decimate(x_data, y_data, n_buckets)
+    
+    def sample_stacked_data(self, x_data, ys, start=0, stop=None, pyramids=None):
+        """
+        Decimate several channels sharing x_data.
+        
+        Args:
+            pyramids (list): Precomputed pyramids of ys; if given, every
+                channel's range [start, stop) is decimated from its own
+                pyramid, otherwise all channels share one bucket layout
+                computed from the raw samples
+        
+        Returns:
+            tuple: (x, y) lists with one array per channel
+        """
+        stop = len(x_data) if stop is None else stop
+        if stop - start <= self.max_preview_points:
+            x_values = np.asarray(x_data[start:stop])
+            return [x_values] * len(ys), [np.asarray(y[start:stop]) for y in ys]
+        
+        n_buckets = max(1, self.max_preview_points // 4)
+        if pyramids is not None:
+            rows = [pyramid.indices(start, stop, n_buckets) for pyramid in pyramids]
+            # x is gathered once for the indices of all channels
+            kept = np.unique(np.concatenate(rows))
+            x_kept = np.asarray(x_data[kept])
+            return ([x_kept[np.searchsorted(kept, row)] for row in rows],
+                    [np.asarray(y[row]) for y, row in zip(ys, rows)])
+        
+        indices = m4_indices_shared(ys, n_buckets, start, stop)
+        # x is gathered once for all channels
+        x_values = x_data[indices.ravel()].reshape(indices.shape)
+        return list(x_values), [y[row] for y, row in zip(ys, indices)]
+    
+    def get_preview_pyramid(self, channel_id, view_key, x_data, y_data, cache_updates=None, x_sorted=None):
+        """
+        Return the min/max pyramid of the previewed data, building it once per
+        channel and view (x axis mode and timespan).
+        
+        Args:
+            cache_updates (list): If given (preview worker), a new pyramid
+                is appended as (cache, key, value) for the main thread to
+                store instead of being stored directly
+            x_sorted (bool): Whether x_data is sorted, if already known
+        
+        Returns:
+            tuple: (MinMaxPyramid, whether x_data is sorted so visible x
+            ranges can be mapped to sample ranges)
+        """
+        cached = self.preview_pyramids.get(channel_id)
+        if cached is not None and cached[0] == view_key and cached[1].length == len(y_data):
+            return cached[1], cached[2]
+        
+        pyramid = MinMaxPyramid(y_data)
+        if x_sorted is None:
+            x_sorted = is_sorted(x_data)
+        self.store_preview_cache(self.preview_pyramids, channel_id, (view_key, pyramid, x_sorted), cache_updates)
+        return pyramid, x_sorted
+    
+    def store_preview_cache(self, cache, key, value, cache_updates=None):
+        """Store a preview cache entry, or queue it for the main thread if cache_updates is given"""
+        if cache_updates is None:
+            cache[key] = value
+        else:
+            cache_updates.append((cache, key, value))
+    
+    def on_preview_xlim_changed(self, axis):
+        """Re-decimate the visible x range from the pyramid after a pan or zoom"""
+        view = self.preview_view
+        if view is None:
+            return
         
-        return sampled_x, sampled_y
+        try:
+            x_data = view['x']
+            x_min, x_max = axis.get_xlim()
+            if np.issubdtype(x_data.dtype, np.datetime64):
+                # Date axes use matplotlib day numbers
+                x_min = np.datetime64(mdates.num2date(x_min).replace(tzinfo=None), 'ns')
+                x_max = np.datetime64(mdates.num2date(x_max).replace(tzinfo=None), 'ns')
+            
+            # One extra sample on each side so the line reaches the axis edges
+            start = max(0, int(x_data.searchsorted(x_min, side='left')) - 1)
+            stop = min(len(x_data), int(x_data.searchsorted(x_max, side='right')) + 1)
+            if (start, stop) == view['range'] or stop <= start:
+                return
+            view['range'] = (start, stop)
+            
+            if 'lines' in view:
+                # Stacked channels: every channel from its own pyramid
+                x_plot, y_plot = self.sample_stacked_data(x_data, view['ys'], start, stop, view['pyramids'])
+                for line, x_values, y_values in zip(view['lines'], x_plot, y_plot):
+                    line.set_data(x_values, y_values)
+                shown = max(y.size for y in y_plot)
+            else:
+                x_plot, y_plot = self.sample_data(x_data, view['y'], view['pyramid'], start, stop)
+                view['line'].set_data(x_plot, y_plot)
+                shown = len(y_plot)
+            self.preview_status_var.set(
+                f"Showing {shown} of {stop - start} points in view{view['info']}")
+            self.preview_canvas.draw_idle()
+        except Exception as e:
+            print(f"Warning: Could not re-decimate preview: {e}")
     
     def clear_preview(self, message="Preview cleared"):
         """Clear the preview plot and show message"""
-        self.preview_axis.clear()
+        # Previews still being computed must not draw over the cleared plot
+        self.cancel_previews()
+        self.preview_view = None
+        self.set_preview_labels("", [""], datetime_axis=False)
+        self.preview_line.set_data([], [])
         self.preview_axis.set_title(message)
-        self.preview_axis.grid(True, alpha=0.3)
-        self.preview_figure.tight_layout()
-        self.preview_canvas.draw()
+        self.preview_canvas.draw_idle()
         self.preview_status_var.set(message)
     
+    def cancel_previews(self):
+        """Drop preview requests and results that are still being computed (main thread)"""
+        self.preview_generation += 1
+        self.preview_drawn_generation = self.preview_generation
+    
+    def clear_preview_caches(self):
+        """Forget the preview pyramids and timespan ranges of the previous files (main thread)"""
+        # Previews still being computed from the previous files must not
+        # store their cache entries either
+        self.cancel_previews()
+        self.preview_pyramids.clear()
+        self.timespan_ranges.clear()
+    
+    def reset_preview_axes(self, count, datetime_axis):
+        """
+        Recreate the preview axes (stacked, sharing x) and their persistent lines.
+        
+        Needed only when the number of axes changes or the x axis switches
+        between numbers and dates, since units, locator and formatter
+        belong to the axes.
+        """
+        self.preview_figure.clear()
+        self.preview_axes = []
+        self.preview_lines = []
+        for index in range(count):
+            axis = self.preview_figure.add_subplot(count, 1, index + 1,
+                                                   sharex=self.preview_axes[0] if self.preview_axes else None)
+            axis.grid(True, alpha=0.3)
+            line, = axis.plot([], [], 'b-', linewidth=1, alpha=0.8)
+            if index < count - 1:
+                axis.tick_params(axis='x', labelbottom=False)
+            self.preview_axes.append(axis)
+            self.preview_lines.append(line)
+        self.preview_axis = self.preview_axes[0]
+        self.preview_line = self.preview_lines[0]
+        
+        # Format x-axis for timestamps (shared by all stacked axes)
+        if datetime_axis:
+            bottom_axis = self.preview_axes[-1]
+            bottom_axis.xaxis_date()
+            bottom_axis.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
+            bottom_axis.xaxis.set_major_locator(MaxNLocator(6))
+            # Rotate labels for better readability
+            bottom_axis.tick_params(axis='x', labelrotation=45)
+            for label in bottom_axis.xaxis.get_majorticklabels():
+                label.set_horizontalalignment('right')
+        
+        # Re-decimate whenever the toolbar pans or zooms; shared axes follow
+        # the first one
+        self.preview_axis.callbacks.connect('xlim_changed', self.on_preview_xlim_changed)
+        self.preview_layout_key = None
+    
+    def set_preview_labels(self, x_label, y_labels, datetime_axis):
+        """
+        Set the preview axis labels, recomputing the layout only if they changed.
+        
+        Args:
+            x_label (str): Label of the shared x axis
+            y_labels (list): One label per stacked axis
+            datetime_axis (bool): Whether x values are datetimes
+        
+        The single-line title does not change the layout, so it is updated
+        separately with set_title on every refresh.
+        """
+        layout_key = (x_label, tuple(y_labels), datetime_axis)
+        if layout_key == self.preview_layout_key:
+            return
+        
+        if (self.preview_layout_key is None or len(self.preview_layout_key[1]) != len(y_labels)
+                or self.preview_layout_key[2] != datetime_axis):
+            self.reset_preview_axes(len(y_labels), datetime_axis)
+        for axis, y_label in zip(self.preview_axes, y_labels):
+            axis.set_ylabel(y_label, fontsize=8 if len(y_labels) > 1 else None)
+        self.preview_axes[-1].set_xlabel(x_label)
+        # Reserve the title line; the caller sets the actual title
+        self.preview_axis.set_title(" ")
+        self.preview_figure.tight_layout()
+        self.preview_layout_key = layout_key
+    
+    def refresh_preview_limits(self):
+        """Autoscale the preview axes to the new line data and schedule a redraw"""
+        for axis in self.preview_axes:
+            axis.relim()
+            axis.autoscale()
+            axis.autoscale_view()
+        self.preview_toolbar.update()
+        self.preview_canvas.draw_idle()
+    
     def suggest_timespan_defaults(self):
         """Suggest default timespan values showing the complete data range (0% to 100%)"""
-        if not self.channels_data or not self.time_column:
+        if not self.channels_data or self.time_column is None:
             return None, None
         
         try:
             # Get time data for analysis
             time_data = self.time_column
-            if not time_data or len(time_data) < 2:
+            if len(time_data) < 2:
                 return None, None
             
             # Determine if we're working with timestamps or numeric data
@@ -577,7 +1200,7 @@ class TDMSViewer(tk.Tk):
                 return (suggested_start.strftime("%H:%M:%S"), 
                        suggested_end.strftime("%H:%M:%S"))
             
-            elif isinstance(first_time, (int, float)):
+            elif isinstance(first_time, (int, float, np.number)):
                 # Working with numeric data (seconds or indices)
                 # Show complete data range from start to end (100% data visibility)
                 suggested_start = first_time
@@ -735,216 +1358,315 @@ class TDMSViewer(tk.Tk):
     
     def parse_timespan_input(self, timespan_str):
         """Parse timespan input string to datetime object or numeric value"""
-        if not timespan_str.strip():
+        return parse_timespan(timespan_str)
+    
+    def find_timespan_ranges(self, x_data, start_value, end_value, axis_key=None, cache_updates=None):
+        """
+        Find the index ranges of x_data inside parsed timespan values by
+        binary search.
+        
+        Time values within each file segment are ascending, so every segment
+        gives at most one (start, stop) range. Results are memoized per time
+        axis and (start, end) pair until the files change, so switching the
+        previewed channel or exporting does not search again. Does not read
+        any widgets, so the preview worker can call it, passing cache_updates
+        to have new ranges stored by the main thread (see get_preview_pyramid).
+        
+        Args:
+            x_data: Time, index or datetime64 values (array or ChunkedArray)
+            start_value: Parsed start (datetime or seconds) or None
+            end_value: Parsed end (datetime or seconds) or None
+            axis_key (tuple): Identifies the time axis for memoization, e.g.
+                (group name, axis label); groups have their own time axes,
+                so the label alone is not unique (not memoized if None)
+            cache_updates (list): See get_preview_pyramid
+        
+        Returns:
+            list: (start, stop) ranges, or None if both values are None
+        """
+        if start_value is None and end_value is None:
             return None
         
-        timespan_str = timespan_str.strip()
+        key = (axis_key, len(x_data), start_value, end_value)
+        cached = self.timespan_ranges.get(key) if axis_key is not None else None
+        if cached is not None:
+            return cached
         
-        # Try to parse as numeric value first (most common case for TDMS time data)
-        try:
-            numeric_value = float(timespan_str)
-            return numeric_value
-        except ValueError:
-            pass
+        # Numeric values are seconds; for datetime data they are relative
+        # to the first datetime
+        lower, upper = timespan_bounds(x_data, start_value, end_value)
+        ranges = find_ranges(x_data, lower, upper)
         
-        # Try to parse as time formats and convert to seconds
-        time_formats = [
-            "%H:%M:%S.%f",           # Time only with microseconds  
-            "%H:%M:%S",              # Time only
-            "%M:%S.%f",              # Minutes and seconds with microseconds
-            "%M:%S",                 # Minutes and seconds
-        ]
+        if axis_key is not None:
+            self.store_preview_cache(self.timespan_ranges, key, ranges, cache_updates)
+        return ranges
+
+    def add_files(self):
+        """Add TDMS files to the processing list"""
+        # Get the last used directory or default to current working directory
+        initial_dir = self.get_last_import_directory()
         
-        for fmt in time_formats:
-            try:
-                time_obj = datetime.strptime(timespan_str, fmt).time()
-                # Convert to total seconds from midnight
-                total_seconds = time_obj.hour * 3600 + time_obj.minute * 60 + time_obj.second + time_obj.microsecond / 1000000
-                return total_seconds
-            except ValueError:
-                continue
+        file_paths = filedialog.askopenfilenames(
+            title="Select TDMS Files",
+            initialdir=initial_dir,
+            filetypes=[("TDMS files", "*.tdms"), ("All files", "*.*")]
+        )
         
-        # Try to parse as full datetime formats
-        datetime_formats = [
-            "%Y-%m-%d %H:%M:%S.%f",  # Full timestamp with microseconds
-            "%Y-%m-%d %H:%M:%S",     # Full timestamp
-        ]
+        if not file_paths:
+            return
         
-        for fmt in datetime_formats:
-            try:
-                return datetime.strptime(timespan_str, fmt)
-            except ValueError:
-                continue
+        # Save the directory for next time
+        self.save_last_import_directory(os.path.dirname(file_paths[0]))
         
-        # Try to parse as numeric value (seconds, index, etc.)
-        try:
-            return float(timespan_str)
-        except ValueError:
-            pass
+        # Add new files to the list (avoid duplicates)
+        known_paths = {f['path'] for f in self.tdms_files}
+        new_paths = [path for path in dict.fromkeys(file_paths) if path not in known_paths]
+        if not new_paths:
+            self.status_var.set(f"No new files added. Total: {len(self.tdms_files)} files")
+            return
         
-        return None
+        self.start_file_loading(new_paths, self.lazy_loading_var.get())
     
-    def filter_data_by_timespan(self, x_data, y_data, start_value=None, end_value=None):
-        """Filter data arrays based on timespan values"""
-        if not x_data or not y_data or len(x_data) != len(y_data):
-            return x_data, y_data
+    def add_folder(self):
+        """Add all TDMS files of a folder, ordered by their first timestamp"""
+        folder = filedialog.askdirectory(title="Select Folder with TDMS Files",
+                                         initialdir=self.get_last_import_directory())
+        if not folder:
+            return
         
-        # Parse timespan inputs
-        if start_value is None:
-            start_str = self.timespan_start_var.get().strip()
-            start_value = self.parse_timespan_input(start_str) if start_str else None
+        self.save_last_import_directory(folder)
         
-        if end_value is None:
-            end_str = self.timespan_end_var.get().strip()
-            end_value = self.parse_timespan_input(end_str) if end_str else None
+        known_paths = {f['path'] for f in self.tdms_files}
+        new_paths = [path for path in sorted(glob.glob(os.path.join(folder, "*.tdms")))
+                     if path not in known_paths]
+        if not new_paths:
+            self.status_var.set(f"No new TDMS files in folder. Total: {len(self.tdms_files)} files")
+            return
         
-        if start_value is None and end_value is None:
-            return x_data, y_data
+        self.start_file_loading(new_paths, self.lazy_loading_var.get())
+    
+    def start_file_loading(self, file_paths, lazy):
+        """Open files and merge their channels on background threads"""
+        if self.export_job is not None:
+            self.status_var.set("An export is running - cancel or wait before adding files")
+            return
         
-        # Convert x_data to comparable format
-        comparable_x = []
-        for x_val in x_data:
-            if isinstance(x_val, datetime):
-                comparable_x.append(x_val)
-            elif isinstance(x_val, (int, float)):
-                comparable_x.append(float(x_val))
-            else:
-                try:
-                    # Try to convert to float for numeric comparison
-                    comparable_x.append(float(x_val))
-                except (ValueError, TypeError):
-                    # If conversion fails, use index-based filtering
-                    comparable_x.append(float(len(comparable_x)))
-        
-        # Convert everything to numeric for simpler comparison
-        # This avoids complex type mixing issues
-        numeric_x = []
-        numeric_start = None
-        numeric_end = None
-        reference_time = None
-        
-        # Find reference time if we have datetime data
-        for x_val in comparable_x:
-            if isinstance(x_val, datetime):
-                reference_time = x_val
-                break
+        cancel_event = threading.Event()
+        self.load_job = {'cancel': cancel_event, 'total': len(file_paths)}
         
-        # Convert x_data to numeric values
-        for x_val in comparable_x:
-            if isinstance(x_val, datetime) and reference_time:
-                # Convert datetime to seconds from first datetime
-                if x_val == reference_time:
-                    numeric_x.append(0.0)
-                else:
-                    numeric_x.append((x_val - reference_time).total_seconds())
-            elif isinstance(x_val, (int, float)):
-                numeric_x.append(float(x_val))
-            else:
-                # Fallback for unknown types - use index
-                numeric_x.append(float(len(numeric_x)))
-        
-        # Convert start/end values to numeric
-        if start_value is not None:
-            if isinstance(start_value, datetime) and reference_time:
-                numeric_start = (start_value - reference_time).total_seconds()
-            elif isinstance(start_value, (int, float)):
-                numeric_start = float(start_value)
-            else:
-                numeric_start = 0.0  # Default start
+        self.add_files_button.config(state=tk.DISABLED)
+        self.add_folder_button.config(state=tk.DISABLED)
+        self.cancel_load_button.config(state=tk.NORMAL)
+        self.status_var.set(f"Loading {len(file_paths)} TDMS files...")
         
-        if end_value is not None:
-            if isinstance(end_value, datetime) and reference_time:
-                numeric_end = (end_value - reference_time).total_seconds()
-            elif isinstance(end_value, (int, float)):
-                numeric_end = float(end_value)
-            else:
-                numeric_end = float('inf')  # Default end
+        worker = threading.Thread(target=self.load_files_worker,
+                                  args=(file_paths, lazy, cancel_event),
+                                  daemon=True)
+        worker.start()
+        self.after(100, self.process_load_queue)
+    
+    def load_files_worker(self, file_paths, lazy, cancel_event):
+        """
+        Open TDMS files and index their channels in a worker pool.
+        
+        Runs on a background thread and must not touch any Tk widgets; the
+        per-file segments are posted to self.load_queue and spliced into the
+        channel store by the main thread.
+        
+        Args:
+            file_paths (list): Paths of the files to open, one task per file
+            lazy (bool): Open files lazily (metadata only)
+            cancel_event (threading.Event): Set to abort the loading
+        """
+        segments = []
+        errors = []
+        channel_ids = set()
+        bytes_decoded = 0
+        done_count = 0
+        
+        workers = max(1, min(len(file_paths), os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self.open_file_task, path, lazy, cancel_event): path
+                       for path in file_paths}
+            # Queued tasks return immediately once cancel_event is set; files
+            # that were already opened are closed below
+            for future in as_completed(futures):
+                done_count += 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(f"{os.path.basename(futures[future])}: {e}")
+                    continue
+                if result is None:
+                    continue
+                
+                segment, file_bytes = result
+                segments.append(segment)
+                channel_ids.update(segment['channels'])
+                bytes_decoded += file_bytes
+                self.load_queue.put(('progress', done_count, len(file_paths), bytes_decoded, len(channel_ids)))
+        
+        if cancel_event.is_set():
+            for segment in segments:
+                self.close_tdms_file(segment['file_info'])
+            self.load_queue.put(('cancelled', len(segments)))
+            return
         
-        # Apply filtering with numeric comparisons
-        filtered_indices = []
-        for i, x_numeric in enumerate(numeric_x):
-            include = True
-            
-            if numeric_start is not None:
-                include = include and (x_numeric >= numeric_start)
-            
-            if numeric_end is not None:
-                include = include and (x_numeric <= numeric_end)
-            
-            if include:
-                filtered_indices.append(i)
+        # Keep the order in which the files were selected
+        order = {path: index for index, path in enumerate(file_paths)}
+        segments.sort(key=lambda segment: order[segment['file_info']['path']])
         
-        # Return filtered data
-        if not filtered_indices:
-            return [], []
+        self.load_queue.put(('done', segments, errors))
+    
+    def open_file_task(self, file_path, lazy, cancel_event):
+        """
+        Open one TDMS file and index its channels (worker pool task).
+        
+        Lazily loaded files that are already in the metadata index are not
+        opened at all; their segment is built from the index record.
+        
+        Returns:
+            tuple: (file segment, bytes decoded), or None if loading was
+            cancelled before the file was opened
+        """
+        if cancel_event.is_set():
+            return None
         
-        filtered_x = [x_data[i] for i in filtered_indices]
-        filtered_y = [y_data[i] for i in filtered_indices]
+        record = self.metadata_index.get(file_path) if self.metadata_index else None
+        if lazy and record is not None:
+            file_info = open_tdms_file(file_path, lazy, defer_open=True)
+            file_info['first_timestamp'] = record['first_timestamp']
+            file_info['last_timestamp'] = record['last_timestamp']
+            return segment_from_record(file_info, record), 0
+        
+        file_info = open_tdms_file(file_path, lazy)
+        with tdms_handle(file_info) as tdms_file:
+            if self.metadata_index is not None:
+                if record is None:
+                    record = read_file_metadata(file_path, tdms_file)
+                    self.metadata_index.put(record)
+                file_info['first_timestamp'] = record['first_timestamp']
+                file_info['last_timestamp'] = record['last_timestamp']
+            segment = scan_tdms_file(file_info, self.disk_cache)
+            bytes_decoded = 0
+            if not lazy:
+                for group in tdms_file.groups():
+                    for channel in group.channels():
+                        bytes_decoded += channel[:].nbytes
+        
+        return segment, bytes_decoded
+    
+    def process_load_queue(self):
+        """Apply messages posted by the file loading worker (main thread)"""
+        try:
+            while True:
+                message = self.load_queue.get_nowait()
+                kind = message[0]
+                
+                if kind == 'progress':
+                    _, done_count, total, bytes_decoded, channel_count = message
+                    self.status_var.set(f"Loading TDMS files... {done_count}/{total} files, "
+                                        f"{bytes_decoded / 1e6:.1f} MB decoded, {channel_count} channels found")
+                elif kind == 'cancelled':
+                    self.finish_file_loading()
+                    self.status_var.set(f"Loading cancelled. Total: {len(self.tdms_files)} files")
+                elif kind == 'done':
+                    _, segments, errors = message
+                    self.finish_file_loading()
+                    self.apply_loaded_files(segments, errors)
+        except queue.Empty:
+            pass
         
-        return filtered_x, filtered_y
-
-    def add_files(self):
-        """Add TDMS files to the processing list"""
-        # Get the last used directory or default to current working directory
-        initial_dir = self.get_last_import_directory()
+        if self.load_job is not None:
+            self.after(100, self.process_load_queue)
+    
+    def finish_file_loading(self):
+        """Reset the loading state and buttons"""
+        self.load_job = None
+        self.add_files_button.config(state=tk.NORMAL)
+        self.add_folder_button.config(state=tk.NORMAL)
+        self.cancel_load_button.config(state=tk.DISABLED)
+    
+    def cancel_file_loading(self):
+        """Request cancellation of the running file loading"""
+        if self.load_job is not None:
+            self.load_job['cancel'].set()
+            self.status_var.set("Cancelling file loading...")
+    
+    def apply_loaded_files(self, segments, errors):
+        """Splice files opened in the background into the dataset and channel lists"""
+        first_load = not self.channels_data
+        
+        for segment in segments:
+            file_info = segment['file_info']
+            self.tdms_files.append(file_info)
+            self.files_listbox.insert(tk.END, self.file_list_label(file_info))
+        
+        if segments:
+            self.channel_store.add_segments(segments)
+            if first_load:
+                # Restore the last saved selection for a fresh dataset
+                self.populate_channel_lists()
+            else:
+                # Keep the current selection; only new channels appear
+                self.update_channel_lists()
         
-        file_paths = filedialog.askopenfilenames(
-            title="Select TDMS Files",
-            initialdir=initial_dir,
-            filetypes=[("TDMS files", "*.tdms"), ("All files", "*.*")]
-        )
+        self.status_var.set(f"Added {len(segments)} files. Total: {len(self.tdms_files)} files, {len(self.channels_data)} channels found")
         
-        if file_paths:
-            try:
-                self.status_var.set("Loading TDMS files...")
-                self.update()
-                
-                # Add new files to the list (avoid duplicates)
-                added_count = 0
-                for file_path in file_paths:
-                    if file_path not in [f['path'] for f in self.tdms_files]:
-                        # Load and validate the TDMS file
-                        tdms_file = TdmsFile.read(file_path)
-                        
-                        self.tdms_files.append({
-                            'path': file_path,
-                            'name': os.path.basename(file_path),
-                            'tdms_obj': tdms_file
-                        })
-                        
-                        # Add to listbox
-                        self.files_listbox.insert(tk.END, os.path.basename(file_path))
-                        added_count += 1
-                
-                # Save the directory for next time
-                if file_paths:
-                    self.save_last_import_directory(os.path.dirname(file_paths[0]))
-                
-                # Reload channels from all files
-                self.load_channels()
-                
-                if added_count > 0:
-                    self.status_var.set(f"Added {added_count} files. Total: {len(self.tdms_files)} files, {len(self.channels_data)} channels found")
-                else:
-                    self.status_var.set(f"No new files added. Total: {len(self.tdms_files)} files")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load TDMS files:\n{str(e)}")
-                self.status_var.set("Error loading files")
+        if errors:
+            messagebox.showerror("Error", "Failed to load TDMS files:\n" + "\n".join(errors))
     
+    def file_list_label(self, file_info):
+        """Return the files list text of a file, with its time range when indexed"""
+        first_timestamp = file_info.get('first_timestamp')
+        last_timestamp = file_info.get('last_timestamp')
+        if first_timestamp is None or last_timestamp is None:
+            return file_info['name']
+        
+        try:
+            start = excel_serial_to_datetime(first_timestamp).strftime("%Y-%m-%d %H:%M:%S")
+            end = excel_serial_to_datetime(last_timestamp).strftime("%Y-%m-%d %H:%M:%S")
+        except (ValueError, OverflowError):
+            return file_info['name']
+        return f"{file_info['name']}  ({start} to {end})"
+    
+    def close_tdms_file(self, file_info):
+        """Close the file handle held by a TDMS file entry"""
+        close_tdms_handle(file_info)
+
+    def clear_disk_cache(self):
+        """Delete all decoded channel data cached on disk"""
+        freed = self.disk_cache.clear()
+        self.status_var.set(f"Disk cache cleared - {freed / 1e6:.1f} MB freed")
+
     def clear_files(self):
         """Clear all selected files"""
+        if self.load_job is not None:
+            self.status_var.set("Files are being loaded - cancel or wait before clearing")
+            return
+        if self.export_job is not None:
+            self.status_var.set("An export is running - cancel or wait before clearing")
+            return
+        
+        # Forget the files before closing them: clearing the store waits
+        # for a decode of the preview worker, and nothing reads them after
+        self.cancel_previews()
+        self.channel_store.clear()
+        for file_info in self.tdms_files:
+            self.close_tdms_file(file_info)
         self.tdms_files.clear()
         self.files_listbox.delete(0, tk.END)
         
         # Clear channels data
-        self.channels_data.clear()
-        self.available_listbox.delete(0, tk.END)
-        self.selected_listbox.delete(0, tk.END)
+        self.clear_preview_caches()
+        self.selection.clear()
+        self.sync_selected_listbox()
         self.all_channels.clear()
+        self.channel_search = ChannelSearchIndex([])
+        self.visible_channels = []
         
         # Restore placeholder text
-        self.available_listbox.insert(tk.END, "No TDMS files loaded - Add files to see channels")
+        self.available_items_var.set(("No TDMS files loaded - Add files to see channels",))
         self.selected_listbox.insert(tk.END, "Selected channels will appear here")
         
         # Update preview channel options and disable export button
@@ -959,95 +1681,50 @@ class TDMSViewer(tk.Tk):
         if not selection:
             return
         
+        if self.load_job is not None:
+            self.status_var.set("Files are being loaded - cancel or wait before removing")
+            return
+        if self.export_job is not None:
+            self.status_var.set("An export is running - cancel or wait before removing")
+            return
+        
         # Remove in reverse order to maintain indices
+        removed_files = []
         for index in reversed(selection):
             self.files_listbox.delete(index)
             if index < len(self.tdms_files):
-                self.tdms_files.pop(index)
+                removed_files.append(self.tdms_files.pop(index))
+        
+        # Splice the removed files out of the dataset before closing them;
+        # remove_files waits for a decode of the preview worker, and nothing
+        # reads the files after it. Other channels and the current selection
+        # are left alone
+        self.cancel_previews()
+        self.channel_store.remove_files([file_info['path'] for file_info in removed_files])
+        for file_info in removed_files:
+            self.close_tdms_file(file_info)
         
-        # Reload channels from remaining files
         if self.tdms_files:
-            self.load_channels()
+            self.update_channel_lists()
             self.status_var.set(f"Files removed. Remaining: {len(self.tdms_files)} files, {len(self.channels_data)} channels")
         else:
             self.clear_files()
-                
-    def load_channels(self):
-        """Load channels from all TDMS files and populate the available channels list"""
-        if not self.tdms_files:
-            return
-            
-        # Clear previous data
-        self.channels_data.clear()
-        self.available_listbox.delete(0, tk.END)
-        self.selected_listbox.delete(0, tk.END)
+    
+    def populate_channel_lists(self):
+        """Fill the available channels list from the channel store and restore the last selection"""
+        combined_channels = self.channels_data
+        self.clear_preview_caches()
         
-        # Sort files by name (assuming chronological naming)
-        sorted_files = sorted(self.tdms_files, key=lambda x: x['name'])
+        # Clear previous data
+        self.selection.clear()
+        self.sync_selected_listbox()
         
-        # Extract time column (if available) and concatenate data from all files
-        self.time_column = None
-        self.time_column_name = None
+        # Store all channels for filtering (sorted by display name)
+        self.all_channels = sorted(channel_info['display_name'] for channel_info in combined_channels.values())
+        self.channel_search = ChannelSearchIndex(self.all_channels)
         
-        # Dictionary to collect data from all files for each channel
-        combined_channels = {}
-        
-        # Process all files in chronological order
-        for file_info in sorted_files:
-            tdms_file = file_info['tdms_obj']
-            file_name = file_info['name']
-            
-            # Collect all channels from this file
-            for group in tdms_file.groups():
-                for channel in group.channels():
-                    # Handle time column - concatenate from all files (do this once per file)
-                    if channel == list(group.channels())[0]:  # First channel of each group
-                        try:
-                            time_data = channel.time_track()
-                            if self.time_column is None:
-                                self.time_column = list(time_data)
-                                self.time_column_name = "Time"
-                            else:
-                                # Append time data from this file
-                                self.time_column.extend(time_data)
-                        except (KeyError, AttributeError):
-                            # Fallback to index if no time track available
-                            if self.time_column is None and len(channel) > 0:
-                                self.time_column = list(range(len(channel)))
-                                self.time_column_name = "Index"
-                            elif self.time_column is not None and len(channel) > 0:
-                                # Extend index for additional data
-                                start_idx = len(self.time_column)
-                                self.time_column.extend(range(start_idx, start_idx + len(channel)))
-                    
-                    # Create channel identifier (without file name since we're combining)
-                    channel_id = f"{group.name}/{channel.name}"
-                    display_name = f"{group.name} - {channel.name}"
-                    
-                    # Collect data from this file
-                    if channel_id not in combined_channels:
-                        combined_channels[channel_id] = {
-                            'display_name': display_name,
-                            'data': list(channel[:]),
-                            'group_name': group.name,
-                            'channel_name': channel.name,
-                            'files_count': 1
-                        }
-                    else:
-                        # Append data from this file to existing channel
-                        combined_channels[channel_id]['data'].extend(channel[:])
-                        combined_channels[channel_id]['files_count'] += 1
-        
-        # Store the combined channel data
-        self.channels_data = combined_channels
-        
-        # Add channels to available list (sorted by display name)
-        sorted_channels = sorted(combined_channels.items(), key=lambda x: x[1]['display_name'])
-        for channel_id, channel_info in sorted_channels:
-            self.available_listbox.insert(tk.END, channel_info['display_name'])
-                
-        # Store all channels for filtering
-        self.all_channels = [channel_info['display_name'] for channel_info in combined_channels.values()]
+        # Add channels to available list
+        self.filter_channels()
         
         # Load and apply last selection if available
         self.load_last_selection()
@@ -1058,75 +1735,131 @@ class TDMSViewer(tk.Tk):
         # Enable export button if channels are available
         if self.channels_data:
             self.export_button.config(state=tk.NORMAL)
+    
+    def update_channel_lists(self):
+        """Refresh the channel lists after files were added or removed, keeping the selection"""
+        # Channel data changed, so previous preview pyramids are stale
+        self.clear_preview_caches()
+        self.all_channels = sorted(channel_info['display_name'] for channel_info in self.channels_data.values())
+        self.channel_search = ChannelSearchIndex(self.all_channels)
+        
+        # Re-apply the current filter to show new channels
+        self.filter_channels()
+        
+        # Drop selected channels that no longer exist in any file
+        if self.selection.retain(self.channel_store.display_names):
+            self.sync_selected_listbox()
+        self.pin_selected_channels()
         
-    def add_channels(self):
-        """Add selected channels from available to selected list"""
-        selection = self.available_listbox.curselection()
-        if not selection:
-            return
-            
-        # Get selected items
-        selected_items = []
-        for index in selection:
-            item_text = self.available_listbox.get(index)
-            selected_items.append((index, item_text))
-        
-        # Add to selected list (avoid duplicates)
-        for index, item_text in selected_items:
-            if item_text not in [self.selected_listbox.get(i) for i in range(self.selected_listbox.size())]:
-                self.selected_listbox.insert(tk.END, item_text)
-                
         self.update_status()
-        # Update preview channel options and trigger preview update
         self.update_preview_channel_options()
         self.update_preview()
-        
-    def add_all_channels(self):
-        """Add all available channels to selected list"""
-        # Clear selected list first
+
+    def get_channel_data(self, channel_id):
+        """
+        Return the combined data of a channel, decoding it on first use.
+
+        Args:
+            channel_id (str): Channel identifier in "Group/Channel" form
+
+        Returns:
+            numpy.ndarray: Channel samples concatenated over all files in
+            their TDMS dtype, or None if the channel does not exist
+        """
+        return self.channel_store.get(channel_id)
+
+    def pin_selected_channels(self):
+        """
+        Keep the selected (and therefore previewed) channels decoded; other
+        channels may be dropped when the memory budget is exceeded. Preview
+        pyramids of channels that are no longer selected are released too.
+        """
+        pinned = {channel_id for channel_id in map(self.channel_store.channel_id, self.selection)
+                  if channel_id is not None}
+        self.channel_store.pin(pinned)
+        for channel_id in [channel_id for channel_id in self.preview_pyramids if channel_id not in pinned]:
+            self.preview_pyramids.pop(channel_id, None)
+    
+    def get_memory_budget(self):
+        """Return the configured memory budget in bytes"""
+        try:
+            return max(1, int(float(self.memory_budget_var.get()))) * 2**20
+        except ValueError:
+            self.memory_budget_var.set(str(DEFAULT_MEMORY_BUDGET_MB))
+            return DEFAULT_MEMORY_BUDGET_MB * 2**20
+    
+    def on_memory_budget_changed(self, event=None):
+        """Apply a changed memory budget to the channel store"""
+        self.channel_store.set_memory_budget(self.get_memory_budget())
+        self.update_memory_status(reschedule=False)
+    
+    def update_memory_status(self, reschedule=True):
+        """Show decoded channel data vs. the memory budget in the status bar"""
+        resident = self.channel_store.resident_bytes()
+        budget = self.channel_store.memory_budget
+        if budget is None:
+            self.memory_status_var.set(f"Memory: {resident / 2**20:.0f} MB")
+        else:
+            self.memory_status_var.set(f"Memory: {resident / 2**20:.0f} / {budget / 2**20:.0f} MB")
+        if reschedule:
+            self.after(1000, self.update_memory_status)
+    
+    def sync_selected_listbox(self):
+        """Show the selection model in the selected channels listbox"""
         self.selected_listbox.delete(0, tk.END)
-        
-        # Add all available channels
-        for i in range(self.available_listbox.size()):
-            item_text = self.available_listbox.get(i)
-            self.selected_listbox.insert(tk.END, item_text)
-            
+        if self.selection:
+            self.selected_listbox.insert(tk.END, *self.selection)
+    
+    def selection_changed(self):
+        """Mirror the selection and refresh everything that depends on it"""
+        self.sync_selected_listbox()
+        self.pin_selected_channels()
         self.update_status()
         # Update preview channel options and trigger preview update
         self.update_preview_channel_options()
         self.update_preview()
+    
+    def add_channels(self):
+        """Add selected channels from available to selected list"""
+        selection = self.available_listbox.curselection()
+        if not selection:
+            return
+        
+        # Add to the selection model (duplicates are skipped)
+        self.selection.add(self.visible_channels[index] for index in selection
+                           if index < len(self.visible_channels))
+        self.selection_changed()
+        
+    def add_all_channels(self):
+        """Add all available channels to selected list"""
+        # Replace the selection with all visible channels
+        self.selection.clear()
+        self.selection.add(self.visible_channels)
+        self.selection_changed()
         
     def remove_channels(self):
         """Remove selected channels from selected list"""
         selection = self.selected_listbox.curselection()
         if not selection:
             return
-            
-        # Remove in reverse order to maintain indices
-        for index in reversed(selection):
-            self.selected_listbox.delete(index)
-            
-        self.update_status()
-        # Update preview channel options and trigger preview update
-        self.update_preview_channel_options()
-        self.update_preview()
+        
+        names = self.selection.names()
+        self.selection.remove(names[index] for index in selection if index < len(names))
+        self.selection_changed()
         
     def remove_all_channels(self):
         """Remove all channels from selected list"""
-        self.selected_listbox.delete(0, tk.END)
-        self.update_status()
-        # Update preview channel options and trigger preview update
-        self.update_preview_channel_options()
-        self.update_preview()
+        self.selection.clear()
+        self.selection_changed()
         
     def update_status(self):
         """Update status bar with current selection info"""
         if not self.channels_data:
             return
             
-        selected_count = self.selected_listbox.size()
+        selected_count = len(self.selection)
         total_count = len(self.channels_data)
-        visible_count = self.available_listbox.size()
+        visible_count = len(self.visible_channels)
         
         if selected_count == 0:
             if visible_count < total_count:
@@ -1144,15 +1877,15 @@ class TDMSViewer(tk.Tk):
         if not hasattr(self, 'all_channels') or not self.all_channels:
             return
             
-        search_term = self.filter_var.get().lower()
-        
-        # Clear the listbox
-        self.available_listbox.delete(0, tk.END)
+        try:
+            self.visible_channels = self.channel_search.search(self.filter_var.get())
+        except re.error as e:
+            # Keep the previous list while a regular expression is incomplete
+            self.status_var.set(f"Invalid regular expression: {e}")
+            return
         
-        # Filter and add matching channels
-        for channel_name in self.all_channels:
-            if search_term in channel_name.lower():
-                self.available_listbox.insert(tk.END, channel_name)
+        # Replace the list contents in one call
+        self.available_items_var.set(tuple(self.visible_channels))
         
         # Update status to show filtered count
         self.update_status()
@@ -1163,156 +1896,227 @@ class TDMSViewer(tk.Tk):
         # The trace will automatically call filter_channels which will show all channels
     
     def export_to_csv(self):
-        """Export selected channels to CSV file"""
-        if self.selected_listbox.size() == 0:
+        """Export selected channels to a CSV, Parquet, Feather, HDF5 or NPZ file"""
+        if not self.selection:
             messagebox.showwarning("No Selection", "Please select at least one channel to export.")
             return
+        if self.export_job is not None:
+            return
+        if self.load_job is not None:
+            self.status_var.set("Files are being loaded - wait before exporting")
+            return
+        
+        # Resampling options
+        resample_interval = None
+        aggregations = self.get_resample_aggregations()
+        if self.resample_enabled_var.get():
+            try:
+                resample_interval = float(self.resample_interval_var.get())
+                if resample_interval <= 0:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("Export Error", "Please enter a resampling interval in seconds greater than 0.")
+                return
+            if not aggregations:
+                messagebox.showerror("Export Error", "Please choose at least one resampling aggregation.")
+                return
         
         # Create export directory if it doesn't exist
         export_dir = os.path.join(os.getcwd(), "export")
         if not os.path.exists(export_dir):
             os.makedirs(export_dir)
             
-        # Generate default filename based on earliest TDMS file
-        if self.tdms_files:
-            # Sort files by name and use the earliest (first) one for naming
-            sorted_files = sorted(self.tdms_files, key=lambda x: x['name'])
-            base_name = os.path.splitext(sorted_files[0]['name'])[0]
-            
-            if len(self.tdms_files) == 1:
-                default_filename = f"{base_name}_export.csv"
-            else:
-                # Multiple files: indicate time range
-                last_file = sorted_files[-1]['name']
-                last_base = os.path.splitext(last_file)[0]
-                default_filename = f"{base_name}_to_{last_base}_export.csv"
-        else:
-            default_filename = "tdms_export.csv"
+        # Selected output format
+        export_format = self.get_export_format()
+        description, extension = EXPORT_FORMATS[export_format]
+        if not format_available(export_format):
+            messagebox.showerror("Export Error",
+                                 f"{description} export requires pyarrow (Parquet/Feather) or "
+                                 f"PyTables (HDF5) to be installed.")
+            return
+        
+        # Generate default filename from the earliest and latest TDMS file names
+        default_filename = default_export_name([file_info['name'] for file_info in self.tdms_files], extension)
         
         # Ask user for filename (with default path in export folder)
         output_file = filedialog.asksaveasfilename(
-            title="Save CSV File",
+            title=f"Save {description} File",
             initialdir=export_dir,
             initialfile=default_filename,
-            defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            defaultextension=extension,
+            filetypes=[(f"{description} files", f"*{extension}"), ("All files", "*.*")]
         )
         
         if not output_file:
             return
-            
+        
+        # A known extension typed by the user selects its format
+        export_format = format_from_path(output_file, default=export_format)
+        
+        # Collect everything the export needs from the widgets here; the
+        # export thread must not touch Tk variables
+        channel_ids = [channel_id for channel_id in map(self.channel_store.channel_id, self.selection)
+                       if channel_id is not None]
+        
+        # Apply the timespan if enabled and "Use for Export" is checked
+        start_value = end_value = None
+        if (hasattr(self, 'timespan_enabled_var') and self.timespan_enabled_var.get() and 
+            hasattr(self, 'timespan_use_for_export_var') and self.timespan_use_for_export_var.get()):
+            start_str = self.timespan_start_var.get().strip()
+            end_str = self.timespan_end_var.get().strip()
+            start_value = self.parse_timespan_input(start_str) if start_str else None
+            end_value = self.parse_timespan_input(end_str) if end_str else None
+        
+        options = dict(export_format=export_format,
+                       include_time=self.include_time_var.get(),
+                       include_timestamp=self.include_timestamp_var.get(),
+                       include_group_names=self.include_group_names_var.get(),
+                       start_value=start_value, end_value=end_value,
+                       workers=self.get_export_workers(),
+                       compression=self.parquet_compression_var.get(),
+                       resample_interval=resample_interval, aggregations=aggregations)
+        self.start_export_job(channel_ids, output_file, options)
+    
+    def start_export_job(self, channel_ids, output_file, options):
+        """Write an export on a background thread, reporting progress through self.export_queue"""
+        cancel_event = threading.Event()
+        worker = threading.Thread(target=self.export_worker,
+                                  args=(channel_ids, output_file, options, cancel_event),
+                                  daemon=True)
+        self.export_job = {
+            'cancel': cancel_event,
+            'thread': worker,
+            'output': output_file,
+            'description': EXPORT_FORMATS[options['export_format']][0],
+            'started': time.monotonic()
+        }
+        
+        self.export_button.config(state=tk.DISABLED)
+        self.cancel_export_button.config(state=tk.NORMAL)
+        self.export_progress_var.set(0.0)
+        self.status_var.set(f"Exporting to {self.export_job['description']}...")
+        
+        worker.start()
+        self.after(100, self.process_export_queue)
+    
+    def export_worker(self, channel_ids, output_file, options, cancel_event):
+        """
+        Assemble and write the export (background thread).
+        
+        Must not touch any Tk widgets; progress and the outcome are posted
+        to self.export_queue. The data is written to a temporary file that
+        is renamed on success and removed on failure or cancellation.
+        """
+        def report_progress(rows_written, total_rows):
+            self.export_queue.put(('progress', rows_written, total_rows))
+        
         try:
-            self.status_var.set("Exporting to CSV...")
-            self.update()
-            
-            # Collect selected channels data
-            export_data = {}
-            
-            # Add time/index column if requested
-            if self.include_time_var.get() and self.time_column is not None:
-                export_data[self.time_column_name] = self.time_column
-            
-            # Add calculated timestamp column if requested
-            if self.include_timestamp_var.get():
-                timestamp_data = self.create_timestamp_column()
-                if timestamp_data is not None:
-                    export_data["Calculated_Timestamp"] = timestamp_data
-            
-            # Add selected channels
-            channel_ids = list(self.channels_data.keys())
-            for i in range(self.selected_listbox.size()):
-                display_name = self.selected_listbox.get(i)
-                
-                # Find corresponding channel ID
-                for channel_id, channel_info in self.channels_data.items():
-                    if channel_info['display_name'] == display_name:
-                        # Create column name based on user preference
-                        if self.include_group_names_var.get():
-                            # Use full display name: "Group - Channel"
-                            clean_name = display_name.replace("/", "_").replace(" ", "_")
-                            clean_name = clean_name.replace(".", "_").replace("-", "_")
-                        else:
-                            # Use only channel name
-                            clean_name = channel_info['channel_name'].replace("/", "_").replace(" ", "_")
-                            clean_name = clean_name.replace(".", "_").replace("-", "_")
-                        
-                        export_data[clean_name] = channel_info['data']
-                        break
-            
-            # Apply timespan filtering if enabled and "Use for Export" is checked
-            export_info = ""
-            if (hasattr(self, 'timespan_enabled_var') and self.timespan_enabled_var.get() and 
-                hasattr(self, 'timespan_use_for_export_var') and self.timespan_use_for_export_var.get()):
-                
-                try:
-                    # Get the reference time data for filtering
-                    reference_time_data = None
-                    if self.time_column is not None:
-                        reference_time_data = self.time_column
-                    elif self.include_timestamp_var.get() and "Calculated_Timestamp" in export_data:
-                        # Convert timestamp strings back to datetime objects for filtering
-                        reference_time_data = []
-                        for ts_str in export_data["Calculated_Timestamp"]:
-                            if ts_str and not ts_str.startswith("Invalid"):
-                                try:
-                                    dt = datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S.%f")
-                                    reference_time_data.append(dt)
-                                except ValueError:
-                                    dt = datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S")
-                                    reference_time_data.append(dt)
-                            else:
-                                reference_time_data.append(None)
-                    
-                    if reference_time_data:
-                        # Create a dummy channel data list to get indices
-                        dummy_data = list(range(len(reference_time_data)))
-                        filtered_time, filtered_dummy = self.filter_data_by_timespan(reference_time_data, dummy_data)
-                        
-                        if len(filtered_dummy) > 0:
-                            # Get the indices of filtered data
-                            filtered_indices = filtered_dummy
-                            original_count = len(reference_time_data)
-                            
-                            # Apply filtering to all export data columns
-                            filtered_export_data = {}
-                            for column_name, column_data in export_data.items():
-                                if len(column_data) == original_count:
-                                    filtered_export_data[column_name] = [column_data[i] for i in filtered_indices]
-                                else:
-                                    # Keep data as-is if length doesn't match
-                                    filtered_export_data[column_name] = column_data
-                            
-                            export_data = filtered_export_data
-                            export_info = f" (filtered to timespan: {len(filtered_indices)} of {original_count} points)"
-                        else:
-                            # No data in timespan - warn user but continue with full export
-                            export_info = " (Warning: No data in specified timespan - exporting all data)"
-                            
-                except Exception as e:
-                    # If filtering fails, continue with unfiltered export but warn user
-                    export_info = f" (Timespan filtering failed: {str(e)[:50]}... - exporting all data)"
-            
-            # Create DataFrame and export
-            df = pd.DataFrame(export_data)
-            df.to_csv(output_file, index=False)
-            
-            # Save current selection for next time
-            self.save_last_selection()
-            
-            messagebox.showinfo("Export Complete", 
-                              f"Successfully exported {len(export_data)} columns to:\n{output_file}{export_info}")
-            self.status_var.set(f"Export complete - {len(export_data)} columns saved{export_info}")
-            
+            summary = export_dataset(self.channel_store, channel_ids, output_file, progress=report_progress,
+                                     cancel_event=cancel_event, **options)
+        except ExportCancelled:
+            self.export_queue.put(('cancelled',))
         except Exception as e:
-            messagebox.showerror("Export Error", f"Failed to export CSV:\n{str(e)}")
-            self.status_var.set("Export failed")
+            self.export_queue.put(('error', str(e)))
+        else:
+            self.export_queue.put(('done', summary))
+    
+    def process_export_queue(self):
+        """Apply messages posted by the export thread (main thread)"""
+        job = self.export_job
+        try:
+            while job is not None:
+                message = self.export_queue.get_nowait()
+                kind = message[0]
+                
+                if kind == 'progress':
+                    _, rows_written, total_rows = message
+                    elapsed = max(time.monotonic() - job['started'], 1e-6)
+                    self.export_progress_var.set(100.0 * rows_written / total_rows if total_rows else 100.0)
+                    self.status_var.set(f"Exporting to {job['description']}... {rows_written:,} of "
+                                        f"{total_rows:,} rows ({rows_written / elapsed:,.0f} rows/s)")
+                elif kind == 'cancelled':
+                    self.finish_export_job()
+                    self.status_var.set("Export cancelled - partial file removed")
+                    job = None
+                elif kind == 'error':
+                    self.finish_export_job()
+                    messagebox.showerror("Export Error", f"Failed to export {job['description']}:\n{message[1]}")
+                    self.status_var.set("Export failed")
+                    job = None
+                elif kind == 'done':
+                    self.finish_export_job()
+                    self.export_complete(job, message[1])
+                    job = None
+        except queue.Empty:
+            pass
+        
+        if self.export_job is not None:
+            self.after(100, self.process_export_queue)
+    
+    def export_complete(self, job, summary):
+        """Report a finished export and remember the selection"""
+        export_info = ""
+        if summary['timespan_error']:
+            # If filtering failed, the unfiltered data was exported
+            export_info = f" (Timespan filtering failed: {summary['timespan_error'][:50]}... - exporting all data)"
+        elif summary['timespan'] is not None:
+            filtered_count, original_count = summary['timespan']
+            if filtered_count > 0:
+                export_info = f" (filtered to timespan: {filtered_count} of {original_count} points)"
+            else:
+                # No data in timespan - the full data was exported
+                export_info = " (Warning: No data in specified timespan - exporting all data)"
+        
+        elapsed = time.monotonic() - job['started']
+        self.export_progress_var.set(100.0)
+        
+        # Save current selection for next time
+        self.save_last_selection()
+        
+        messagebox.showinfo("Export Complete", 
+                          f"Successfully exported {summary['columns']} columns to:\n{summary['output']}{export_info}")
+        self.status_var.set(f"Export complete - {summary['columns']} columns, {summary['rows']:,} rows "
+                            f"saved in {elapsed:.1f} s{export_info}")
+    
+    def finish_export_job(self):
+        """Reset the export state and buttons"""
+        self.export_job = None
+        self.cancel_export_button.config(state=tk.DISABLED)
+        if self.channels_data:
+            self.export_button.config(state=tk.NORMAL)
+    
+    def cancel_export(self):
+        """Request cancellation of the running export"""
+        if self.export_job is not None:
+            self.export_job['cancel'].set()
+            self.export_progress_var.set(0.0)
+            self.status_var.set("Cancelling export...")
+    
+    def get_export_format(self):
+        """Return the key of the export format selected in the format box"""
+        selected = self.export_format_var.get()
+        for export_format, (description, _) in EXPORT_FORMATS.items():
+            if description == selected:
+                return export_format
+        return 'csv'
+    
+    def get_resample_aggregations(self):
+        """Return the checked resampling aggregations in RESAMPLE_AGGREGATIONS order"""
+        return tuple(aggregation for aggregation, variable in self.resample_aggregation_vars.items()
+                     if variable.get())
+    
+    def get_export_workers(self):
+        """Return the configured number of export worker processes (at least 1)"""
+        try:
+            return max(1, int(self.export_workers_var.get()))
+        except ValueError:
+            self.export_workers_var.set(str(DEFAULT_WORKERS))
+            return DEFAULT_WORKERS
     
     def save_last_selection(self):
         """Save the currently selected channels to a JSON file"""
         try:
-            selected_channels = []
-            for i in range(self.selected_listbox.size()):
-                selected_channels.append(self.selected_listbox.get(i))
+            selected_channels = self.selection.names()
             
             # Get current settings if file exists
             current_settings = {}
@@ -1328,11 +2132,20 @@ class TDMSViewer(tk.Tk):
                 "include_time_column": self.include_time_var.get(),
                 "include_timestamp_column": self.include_timestamp_var.get(),
                 "include_group_names": self.include_group_names_var.get(),
+                "export_workers": self.get_export_workers(),
+                "export_format": self.get_export_format(),
+                "parquet_compression": self.parquet_compression_var.get(),
+                "memory_budget_mb": self.get_memory_budget() // 2**20,
+                "resample_enabled": self.resample_enabled_var.get(),
+                "resample_interval": self.resample_interval_var.get(),
+                "resample_aggregations": list(self.get_resample_aggregations()),
                 "last_import_directory": current_settings.get("last_import_directory", os.getcwd()),
 
                 "max_preview_points": getattr(self, 'max_preview_points', 10000),
                 "preview_channel": getattr(self, 'preview_channel_var', tk.StringVar()).get(),
                 "preview_use_timestamp": getattr(self, 'preview_use_timestamp_var', tk.BooleanVar()).get(),
+                "preview_stacked": getattr(self, 'preview_stacked_var', tk.BooleanVar()).get(),
+                "preview_stack_limit": self.get_stack_limit(),
                 "timespan_enabled": getattr(self, 'timespan_enabled_var', tk.BooleanVar()).get(),
                 "timespan_start": getattr(self, 'timespan_start_var', tk.StringVar()).get(),
                 "timespan_end": getattr(self, 'timespan_end_var', tk.StringVar()).get(),
@@ -1358,10 +2171,19 @@ class TDMSViewer(tk.Tk):
             include_time = settings.get("include_time_column", True)
             include_timestamp = settings.get("include_timestamp_column", False)
             include_group_names = settings.get("include_group_names", True)
+            export_workers = settings.get("export_workers", DEFAULT_WORKERS)
+            export_format = settings.get("export_format", 'csv')
+            parquet_compression = settings.get("parquet_compression", PARQUET_COMPRESSIONS[0])
+            memory_budget_mb = settings.get("memory_budget_mb", DEFAULT_MEMORY_BUDGET_MB)
+            resample_enabled = settings.get("resample_enabled", False)
+            resample_interval = settings.get("resample_interval", "1.0")
+            resample_aggregations = settings.get("resample_aggregations", ["mean"])
 
             max_preview_points = settings.get("max_preview_points", 10000)
             preview_channel = settings.get("preview_channel", "First Selected")
             preview_use_timestamp = settings.get("preview_use_timestamp", False)
+            preview_stacked = settings.get("preview_stacked", False)
+            preview_stack_limit = settings.get("preview_stack_limit", 8)
             timespan_enabled = settings.get("timespan_enabled", False)
             timespan_start = settings.get("timespan_start", "")
             timespan_end = settings.get("timespan_end", "")
@@ -1376,6 +2198,22 @@ class TDMSViewer(tk.Tk):
             # Apply group names setting
             self.include_group_names_var.set(include_group_names)
             
+            # Apply export format, compression and worker count
+            self.export_format_var.set(EXPORT_FORMATS.get(export_format, EXPORT_FORMATS['csv'])[0])
+            if parquet_compression in PARQUET_COMPRESSIONS:
+                self.parquet_compression_var.set(parquet_compression)
+            self.export_workers_var.set(str(export_workers))
+            
+            # Apply the memory budget
+            self.memory_budget_var.set(str(memory_budget_mb))
+            self.channel_store.set_memory_budget(self.get_memory_budget())
+            
+            # Apply resampling settings
+            self.resample_enabled_var.set(resample_enabled)
+            self.resample_interval_var.set(resample_interval)
+            for aggregation, variable in self.resample_aggregation_vars.items():
+                variable.set(aggregation in resample_aggregations)
+            
             # Apply preview settings
             # Preview enabled always defaults to False - not saved in settings
             if hasattr(self, 'max_preview_points'):
@@ -1385,6 +2223,9 @@ class TDMSViewer(tk.Tk):
                 self.preview_channel_var.set(preview_channel)
             if hasattr(self, 'preview_use_timestamp_var'):
                 self.preview_use_timestamp_var.set(preview_use_timestamp)
+            if hasattr(self, 'preview_stacked_var'):
+                self.preview_stacked_var.set(preview_stacked)
+                self.preview_stack_limit_var.set(str(preview_stack_limit))
             
             # Apply timespan settings
             if hasattr(self, 'timespan_enabled_var'):
@@ -1402,20 +2243,15 @@ class TDMSViewer(tk.Tk):
                 for widget in self.timespan_widgets:
                     widget.config(state=state)
             
-            # Apply channel selection
-            for channel_name in last_channels:
-                # Check if this channel exists in current file
-                for i in range(self.available_listbox.size()):
-                    if self.available_listbox.get(i) == channel_name:
-                        # Add to selected list if not already there
-                        if channel_name not in [self.selected_listbox.get(j) for j in range(self.selected_listbox.size())]:
-                            self.selected_listbox.insert(tk.END, channel_name)
-                        break
+            # Apply channel selection (channels that exist in the current files)
+            self.selection.add(name for name in last_channels if name in self.channel_store.display_names)
+            self.sync_selected_listbox()
+            self.pin_selected_channels()
             
             self.update_status()
             
             if last_channels:
-                restored_count = self.selected_listbox.size()
+                restored_count = len(self.selection)
                 self.status_var.set(f"Restored {restored_count} previously selected channels")
                 
                 # Update preview channel options after loading selection
@@ -1467,44 +2303,21 @@ class TDMSViewer(tk.Tk):
         return os.getcwd()
     
     def create_timestamp_column(self):
-        """Create a calculated timestamp column from MachineStatus - Timestamp channel"""
+        """
+        Return the calculated timestamps from the MachineStatus - Timestamp channel.
+        
+        The Excel serial dates are converted to datetime64[ns] once and cached
+        by the channel store until files are added or removed; text is only
+        produced at CSV write time (see format_timestamps).
+        
+        Returns:
+            ChunkedArray: datetime64[ns] timestamps (NaT for empty values), or None
+        """
         try:
-            # Look for the MachineStatus - Timestamp channel (combined data)
-            timestamp_data = None
-            
-            # Search in channels_data for the timestamp channel
-            for channel_id, channel_info in self.channels_data.items():
-                # Check if this channel contains "MachineStatus - Timestamp" 
-                if ("MachineStatus" in channel_info['group_name'] and 
-                    "Timestamp" in channel_info['channel_name']):
-                    timestamp_data = channel_info['data']
-                    break
-            
-            if timestamp_data is None:
+            timestamps = self.channel_store.timestamps()
+            if timestamps is None:
                 print(f"Warning: MachineStatus - Timestamp channel not found")
-                return None
-            
-            # Convert Excel epoch time to readable timestamps
-            # Excel epoch starts at 1900-01-01, but has a leap year bug (treats 1900 as leap year)
-            # So we need to subtract 2 days (1900-01-01 to 1899-12-30) and account for the bug
-            excel_epoch = datetime(1899, 12, 30)  # Excel's actual epoch after accounting for the bug
-            
-            readable_timestamps = []
-            for excel_time in timestamp_data:
-                try:
-                    # Convert Excel serial date to datetime
-                    if pd.isna(excel_time) or excel_time == 0:
-                        readable_timestamps.append("")
-                    else:
-                        # Excel time is in days since epoch
-                        python_datetime = excel_epoch + timedelta(days=float(excel_time))
-                        # Format as ISO string with milliseconds
-                        readable_timestamps.append(python_datetime.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3])
-                except (ValueError, TypeError, OverflowError) as e:
-                    # Handle invalid timestamp values
-                    readable_timestamps.append(f"Invalid: {excel_time}")
-            
-            return readable_timestamps
+            return timestamps
             
         except Exception as e:
             print(f"Error creating timestamp column: {e}")